@@ -0,0 +1,716 @@
+"""
+Benchmarks for the report pipeline.
+
+Usage: python bench.py [benchmark[=argument] ...]    (runs every benchmark when none is given)
+       python bench.py csv=/path/to/export.csv           (time the CSV readers on a real export)
+"""
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Pt
+
+from exploitability import Exploitability
+from severity import Severity
+from theme import apply_document_theme
+
+RUNS_PER_FINDING = 30  # Roughly the number of runs create_table/append_data produce
+
+
+def timed(func, *args, repeat=5):
+    """Best wall time of func(*args) over a few repeats, in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(name, seconds, note=""):
+    print(f"{name:<45} {seconds * 1000:>10.2f} ms  {note}")
+
+
+def build_findings_document(findings, runs_per_finding=RUNS_PER_FINDING):
+    """Document with one single-cell table of runs per finding, built in one XML parse."""
+    doc = Document()
+    run = '<w:r><w:t>10.0.0.1:443</w:t></w:r>'
+    table = (
+        '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/></w:tblPr><w:tblGrid><w:gridCol/></w:tblGrid>'
+        f'<w:tr><w:tc><w:p>{run * runs_per_finding}</w:p></w:tc></w:tr></w:tbl><w:p/>'
+    )
+    body = parse_xml(f'<w:body {nsdecls("w")}>{table * findings}</w:body>')
+    sectPr = doc.element.body[-1]
+    for element in list(body):
+        sectPr.addprevious(element)
+    return doc
+
+
+def legacy_font_walk(doc, font_name="Helvetica", font_size=10.5):
+    """The previous set_document_font: visit every run of every table."""
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    for run in paragraph.runs:
+                        run.font.name = font_name
+                        run.font.size = Pt(font_size)
+
+
+def bench_theme(findings=10000, legacy_findings=1000):
+    """Style-based theming must cost the same with zero and with 10k findings."""
+    print(f"-- theme ({findings} findings, {RUNS_PER_FINDING} runs each)")
+    empty = Document()
+    report("apply_document_theme, empty document", timed(apply_document_theme, empty, "Helvetica", 10.5))
+
+    full = build_findings_document(findings)
+    report(f"apply_document_theme, {findings} findings", timed(apply_document_theme, full, "Helvetica", 10.5))
+
+    # The legacy walk is linear in runs, a smaller document is enough to show the per-run cost
+    legacy = build_findings_document(legacy_findings)
+    seconds = timed(legacy_font_walk, legacy, repeat=1)
+    per_run = seconds / (legacy_findings * RUNS_PER_FINDING) * 1e6
+    report(f"legacy run walk, {legacy_findings} findings", seconds, f"({per_run:.2f} us per run)")
+
+
+def synthetic_findings(count, hosts_per_finding=3):
+    """Grouped findings shaped like the ones script5.main builds from the CSV."""
+    findings = {}
+    for index in range(count):
+        name = f"Synthetic Finding {index + 1}"
+        findings[name] = {
+            "name": name,
+            "finding_id": f"ABCXYZ-{index + 1}",
+            "description": "The remote host is affected by a synthetic vulnerability",
+            "cvs_score": "7.5",
+            "risk_factor": "High",
+            "severity": Severity.HIGH,
+            "exploitability": Exploitability.REMOTE,
+            "remote_exploitability": "Yes",
+            "affected_resource": {f"10.0.{index % 250}.{host + 1}:443" for host in range(hosts_per_finding)},
+            "mitigation": "Upgrade to the latest version.",
+            "references": ("https://example.com/advisory",),
+        }
+    return findings
+
+
+def quiet_script5():
+    """Import script5 without its INFO logging flooding the benchmark output."""
+    import script5
+    logging.getLogger().setLevel(logging.WARNING)
+    return script5
+
+
+def render_report(findings, **render_options):
+    """Render synthetic findings into a new document the way script5.main does."""
+    script5 = quiet_script5()
+    doc = Document()
+    script5.set_document_font(doc, "Helvetica", 10.5)
+    doc.add_heading('RNS DATA AUTOMATION', level=1)
+    script5.render_findings(doc, synthetic_findings(findings), **render_options)
+    return doc
+
+
+def saved_bytes(save, *args, **kwargs):
+    """Save into a fresh buffer and return the bytes written."""
+    buffer = io.BytesIO()
+    save(buffer, *args, **kwargs)
+    return buffer.getvalue()
+
+
+def document_xml_size(docx_bytes):
+    with zipfile.ZipFile(io.BytesIO(docx_bytes)) as package:
+        return package.getinfo('word/document.xml').file_size
+
+
+def bench_pagination(findings=200):
+    """Output size, render and save time of each pagination mode."""
+    print(f"-- pagination ({findings} findings)")
+    for mode in ("section", "page_break", "heading"):
+        start = time.perf_counter()
+        doc = render_report(findings, pagination=mode)
+        report(f"render, {mode}", time.perf_counter() - start)
+        seconds = timed(saved_bytes, doc.save)
+        data = saved_bytes(doc.save)
+        sections = len(doc.sections)
+        report(f"save, {mode}", seconds,
+               f"document.xml {document_xml_size(data) / 1024:.0f} KiB, docx {len(data) / 1024:.0f} KiB, "
+               f"{sections} sections")
+
+
+def bench_save(findings=200):
+    """Save time and size per compression level, measured apart from render time."""
+    from docx_writer import COMPRESSION_LEVELS, save_document
+
+    print(f"-- save ({findings} findings)")
+    start = time.perf_counter()
+    doc = render_report(findings)
+    report("render", time.perf_counter() - start)
+
+    size = len(saved_bytes(doc.save))
+    report("doc.save", timed(saved_bytes, doc.save), f"{size / 1024:.0f} KiB")
+    for compression in COMPRESSION_LEVELS:
+        def save(buffer):
+            save_document(doc, buffer, compression=compression, static_key="bench")
+        size = len(saved_bytes(save))
+        report(f"save_document, {compression}", timed(saved_bytes, save), f"{size / 1024:.0f} KiB")
+
+
+def read_column(csv_path, column_name):
+    import csv
+    with open(csv_path, 'r', encoding='utf-8', errors='ignore', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        index = next(reader).index(column_name)
+        return [row[index] for row in reader if len(row) > index]
+
+
+def bench_summary(csv_path='dataset.csv', repeat_column=50):
+    """First-sentence extraction over the full Description column."""
+    from summarize import first_sentence, summarize_description
+
+    descriptions = read_column(csv_path, 'Description') * repeat_column
+    plugin_ids = read_column(csv_path, 'Plugin ID') * repeat_column
+    print(f"-- summary ({len(descriptions)} descriptions)")
+
+    report("split('.')[0]", timed(lambda: [text.split('.')[0] for text in descriptions]))
+    report("first_sentence", timed(lambda: [first_sentence(text) for text in descriptions]))
+    report("summarize_description, memoized per plugin",
+           timed(lambda: [summarize_description(text, pid) for text, pid in zip(descriptions, plugin_ids)]))
+
+
+def scaled_csv(csv_path, size_mb):
+    """Temporary copy of the CSV with its data rows repeated until it is about size_mb large."""
+    with open(csv_path, 'rb') as source:
+        header = source.readline()
+        rows = source.read()
+    if not rows.endswith(b'\n'):
+        rows += b'\n'
+    handle, scaled_path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(handle, 'wb') as scaled:
+        scaled.write(header)
+        for _ in range(max(1, size_mb * 1024 * 1024 // len(rows))):
+            scaled.write(rows)
+    return scaled_path
+
+
+def bench_csv(csv_path=None, size_mb=200):
+    """Text-mode csv.reader against the mmap reader, raw iteration and grouping, serial and in parallel."""
+    from nessus_csv import iter_required_fields
+
+    script5 = quiet_script5()
+    scaled_path = None
+    if csv_path is None:
+        csv_path = scaled_path = scaled_csv('dataset.csv', size_mb)
+    try:
+        size = os.path.getsize(csv_path)
+        print(f"-- csv ({size / 1024 / 1024:.0f} MiB, {csv_path})")
+        for reader in ("text", "mmap"):
+            rows = []
+            seconds = timed(lambda: rows.append(sum(1 for _ in iter_required_fields(csv_path, reader=reader))),
+                            repeat=1)
+            report(f"iter_required_fields, {reader}", seconds,
+                   f"{rows[-1]} rows, {size / seconds / 1024 / 1024:.0f} MiB/s")
+            findings = []
+            seconds = timed(lambda: findings.append(len(script5.load_grouped_vulnerabilities(csv_path, reader))),
+                            repeat=1)
+            report(f"load_grouped_vulnerabilities, {reader}", seconds, f"{findings[-1]} findings")
+
+        workers = max(2, os.cpu_count() or 1)
+        findings = []
+        seconds = timed(lambda: findings.append(script5.load_grouped_vulnerabilities(csv_path, "mmap", workers)),
+                        repeat=1)
+        same = findings[-1] == script5.load_grouped_vulnerabilities(csv_path, "mmap", 1)
+        report(f"load_grouped_vulnerabilities, {workers} workers", seconds,
+               f"{len(findings[-1])} findings, {'same' if same else 'DIFFERENT'} as serial")
+    finally:
+        if scaled_path:
+            os.remove(scaled_path)
+
+
+def nessus_from_csv(csv_path, nessus_path):
+    """Write the CSV's rows as a .nessus file, one ReportHost per run of rows of the same host."""
+    import csv
+    from lxml import etree
+    from nessus_xml import NESSUS_COLUMNS
+
+    with open(csv_path, 'r', encoding='utf-8', errors='ignore', newline='') as csv_file, \
+            etree.xmlfile(nessus_path, encoding='utf-8') as xml_file:
+        reader = csv.reader(csv_file)
+        header = next(reader)
+        with xml_file.element('NessusClientData_v2'), xml_file.element('Report', name='bench'):
+            host, host_element = None, None
+            for row in reader:
+                values = dict(zip(header, row))
+                if values['Host'] != host:
+                    if host_element is not None:
+                        host_element.__exit__(None, None, None)
+                    host = values['Host']
+                    host_element = xml_file.element('ReportHost', name=host)
+                    host_element.__enter__()
+                    xml_file.write(etree.Element('HostProperties'))
+                item = etree.Element('ReportItem', {
+                    name: values.get(column, '')
+                    for column, (source, name) in NESSUS_COLUMNS.items() if source == 'item'
+                })
+                for column, (source, name) in NESSUS_COLUMNS.items():
+                    if source == 'child' and values.get(column):
+                        etree.SubElement(item, name).text = values[column]
+                xml_file.write(item)
+            if host_element is not None:
+                host_element.__exit__(None, None, None)
+
+
+def _peak_load(path):
+    """Load time, grouped findings and peak RSS of one load, run in a fresh process."""
+    import resource
+    script5 = quiet_script5()
+    start = time.perf_counter()
+    findings = script5.load_grouped_vulnerabilities(path)
+    seconds = time.perf_counter() - start
+    return seconds, findings, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench_nessus(csv_path=None, size_mb=100):
+    """The same scan loaded from CSV and from .nessus XML: time, peak memory and equal findings."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    scaled_path = None
+    if csv_path is None:
+        csv_path = scaled_path = scaled_csv('dataset.csv', size_mb)
+    nessus_path = os.path.splitext(csv_path)[0] + '.bench.nessus'
+    try:
+        nessus_from_csv(csv_path, nessus_path)
+        print(f"-- nessus (csv {os.path.getsize(csv_path) / 1024 / 1024:.0f} MiB, "
+              f"nessus {os.path.getsize(nessus_path) / 1024 / 1024:.0f} MiB)")
+        results = {}
+        for path in (csv_path, nessus_path):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                seconds, findings, peak = pool.submit(_peak_load, path).result()
+            results[path] = findings
+            report(f"load_grouped_vulnerabilities, {os.path.splitext(path)[1]}", seconds,
+                   f"{len(findings)} findings, peak RSS {peak / 1024:.0f} MiB")
+        print(f"same grouped findings: {results[csv_path] == results[nessus_path]}")
+    finally:
+        if os.path.exists(nessus_path):
+            os.remove(nessus_path)
+        if scaled_path:
+            os.remove(scaled_path)
+
+
+def bench_cache(csv_path=None, size_mb=200):
+    """Parsing the scan against loading its grouped findings from the scan cache."""
+    import shutil
+    from scan_cache import _arrow, cached_grouped_vulnerabilities, scan_digest
+
+    script5 = quiet_script5()
+    scaled_path = None
+    if csv_path is None:
+        csv_path = scaled_path = scaled_csv('dataset.csv', size_mb)
+    cache_dir = tempfile.mkdtemp()
+    try:
+        backend = "arrow" if _arrow() is not None else "pickle"
+        print(f"-- cache ({os.path.getsize(csv_path) / 1024 / 1024:.0f} MiB, {backend} backend)")
+        report("load_grouped_vulnerabilities", timed(script5.load_grouped_vulnerabilities, csv_path, repeat=1))
+        report("scan_digest", timed(scan_digest, csv_path))
+        report("cache miss (parse + store)",
+               timed(cached_grouped_vulnerabilities, csv_path, script5.load_grouped_vulnerabilities, cache_dir,
+                     repeat=1))
+        seconds = timed(cached_grouped_vulnerabilities, csv_path, script5.load_grouped_vulnerabilities, cache_dir)
+        same = (cached_grouped_vulnerabilities(csv_path, script5.load_grouped_vulnerabilities, cache_dir)
+                == script5.load_grouped_vulnerabilities(csv_path))
+        report("cache hit", seconds, f"{'same' if same else 'DIFFERENT'} findings as a parse")
+    finally:
+        shutil.rmtree(cache_dir)
+        if scaled_path:
+            os.remove(scaled_path)
+
+
+def _bench_postgres(rows, dsn):
+    """Same import and query against PostgreSQL, only when psycopg2 and FINDINGS_PG_DSN are available."""
+    import psycopg2
+    from psycopg2.extras import execute_values
+
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cursor:
+        cursor.execute("CREATE TEMP TABLE scan_rows (plugin_id TEXT, name TEXT, host TEXT, port TEXT)")
+        start = time.perf_counter()
+        execute_values(cursor, "INSERT INTO scan_rows VALUES %s",
+                       [(row['plugin_id'], row['name'], row['host'], row['port']) for row in rows], page_size=10000)
+        cursor.execute("CREATE INDEX ON scan_rows (plugin_id)")
+        report("postgres import", time.perf_counter() - start)
+        start = time.perf_counter()
+        cursor.execute("SELECT name, host, port FROM scan_rows ORDER BY ctid")
+        count = len(cursor.fetchall())
+        report("postgres query", time.perf_counter() - start, f"{count} rows")
+
+
+def bench_store(csv_path=None, size_mb=100):
+    """SQLite findings store import and query against parsing the CSV (and PostgreSQL when configured)."""
+    from findings_store import connect_store, import_scan, iter_store_rows
+    from scan_cache import scan_digest
+    from scanner_formats import iter_scan_rows
+
+    script5 = quiet_script5()
+    scaled_path = None
+    if csv_path is None:
+        csv_path = scaled_path = scaled_csv('dataset.csv', size_mb)
+    db_dir = tempfile.mkdtemp()
+    try:
+        print(f"-- store ({os.path.getsize(csv_path) / 1024 / 1024:.0f} MiB)")
+        report("csv, load_grouped_vulnerabilities", timed(script5.load_grouped_vulnerabilities, csv_path, repeat=1))
+
+        conn = connect_store(os.path.join(db_dir, 'findings.db'))
+        start = time.perf_counter()
+        scan_id = import_scan(conn, csv_path, scan_digest(csv_path), iter_scan_rows(csv_path))
+        rows = conn.execute("SELECT row_count FROM scans WHERE scan_id = ?", (scan_id,)).fetchone()[0]
+        report("sqlite import", time.perf_counter() - start,
+               f"{rows} rows, {os.path.getsize(os.path.join(db_dir, 'findings.db')) / 1024 / 1024:.0f} MiB")
+
+        grouped = []
+        report("sqlite query + group", timed(
+            lambda: grouped.append(script5.group_vulnerabilities(iter_store_rows(conn, scan_id))), repeat=1))
+        same = grouped[-1] == script5.load_grouped_vulnerabilities(csv_path)
+        print(f"same grouped findings as the csv: {same}")
+        report("sqlite query + group, High and Critical only", timed(
+            lambda: script5.group_vulnerabilities(iter_store_rows(conn, scan_id, min_severity=Severity.HIGH)),
+            repeat=1))
+        conn.close()
+
+        dsn = os.environ.get('FINDINGS_PG_DSN')
+        try:
+            import psycopg2  # noqa: F401
+        except ImportError:
+            dsn = None
+        if dsn:
+            _bench_postgres(list(iter_scan_rows(csv_path)), dsn)
+        else:
+            print("postgres skipped (needs psycopg2 and FINDINGS_PG_DSN)")
+    finally:
+        for name in os.listdir(db_dir):
+            os.remove(os.path.join(db_dir, name))
+        os.rmdir(db_dir)
+        if scaled_path:
+            os.remove(scaled_path)
+
+
+def synthetic_scan_rows(rows, first_host=0, plugins=500):
+    """Row dicts of a scan with rows rows, spread over plugins plugins and as many hosts as needed."""
+    texts = {
+        str(plugin): {'description': f"Plugin {plugin} detected a synthetic issue. More text follows.",
+                      'cvs_score': '7.5', 'risk_factor': 'High', 'mitigation': 'Upgrade.',
+                      'references': 'https://example.com/advisory', 'protocol': 'tcp'}
+        for plugin in range(plugins)
+    }
+    for index in range(rows):
+        plugin = str(index % plugins)
+        host = first_host + index // plugins
+        yield {**texts[plugin], 'plugin_id': plugin, 'name': f"Synthetic Finding {plugin}",
+               'host': f"10.{host >> 16 & 255}.{host >> 8 & 255}.{host & 255}", 'port': '443'}
+
+
+def bench_delta(rows=1000000, changed=0.05):
+    """Indexing and diffing two scans of rows rows each, a fraction changed of the hosts replaced."""
+    from delta import delta_rows, diff_scans, index_scan
+
+    script5 = quiet_script5()
+    print(f"-- delta ({rows} rows per scan, {changed:.0%} of the rows changed)")
+    shift = int(rows * changed) // 500 or 1  # hosts of the previous scan that were fixed
+    start = time.perf_counter()
+    previous = index_scan(synthetic_scan_rows(rows))
+    current = index_scan(synthetic_scan_rows(rows, first_host=shift))
+    report("index_scan, both scans", time.perf_counter() - start)
+
+    delta = []
+    report("diff_scans", timed(lambda: delta.append(diff_scans(previous, current)), repeat=1),
+           f"{len(delta[-1].new)} new, {len(delta[-1].resolved)} resolved, {len(delta[-1].persisting)} persisting")
+    report("group new and resolved", timed(lambda: (
+        script5.group_vulnerabilities(delta_rows(current, delta[-1].new)),
+        script5.group_vulnerabilities(delta_rows(previous, delta[-1].resolved)),
+    ), repeat=1))
+
+
+def _tracker_run(path, findings, hosts_per_finding):
+    """Time and peak RSS of one tracker export, run in a fresh process."""
+    import resource
+    from tracker import _writer, write_tracker
+
+    grouped = synthetic_findings(findings, hosts_per_finding)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    written = write_tracker(grouped, path)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    backend = _writer()[0] if _writer() else "csv"
+    return backend, written, seconds, before, peak
+
+
+def bench_tracker(rows=1000000, hosts_per_finding=1000):
+    """Remediation tracker export of rows rows, with the peak memory of the writer."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    findings = max(1, rows // hosts_per_finding)
+    tracker_dir = tempfile.mkdtemp()
+    try:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            backend, written, seconds, before, peak = pool.submit(
+                _tracker_run, os.path.join(tracker_dir, 'tracker.xlsx'), findings, hosts_per_finding).result()
+        print(f"-- tracker ({findings * hosts_per_finding} rows, {backend})")
+        report("write_tracker", seconds,
+               f"{os.path.getsize(written) / 1024 / 1024:.0f} MiB, RSS {before / 1024:.0f} MiB before, "
+               f"{peak / 1024:.0f} MiB peak")
+    finally:
+        for name in os.listdir(tracker_dir):
+            os.remove(os.path.join(tracker_dir, name))
+        os.rmdir(tracker_dir)
+
+
+def bench_html(findings=10000):
+    """HTML preview of findings findings, against the docx render of a few hundred."""
+    from functools import partial
+    from html_report import write_html_report
+
+    script5 = quiet_script5()
+    html_dir = tempfile.mkdtemp()
+    try:
+        print(f"-- html ({findings} findings)")
+        path = os.path.join(html_dir, 'preview.html')
+        grouped = synthetic_findings(findings)
+        module_name = partial(script5.get_module_name, predefined_keywords=script5.KEYWORDS)
+        seconds = timed(write_html_report, grouped, path, "RNS DATA AUTOMATION", module_name, repeat=1)
+        report("write_html_report", seconds, f"{os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+
+        docx_findings = 200
+        start = time.perf_counter()
+        render_report(docx_findings)
+        seconds = time.perf_counter() - start
+        report(f"docx render, {docx_findings} findings", seconds,
+               f"({seconds / docx_findings * findings:.0f} s extrapolated to {findings})")
+    finally:
+        for name in os.listdir(html_dir):
+            os.remove(os.path.join(html_dir, name))
+        os.rmdir(html_dir)
+
+
+def bench_formats(csv_path=None, size_mb=100):
+    """Format detection cost against the export size, and which adapters a Nessus CSV run imports."""
+    import subprocess
+    from scanner_formats import SCANNER_FORMATS, detect_format
+
+    scaled_path = None
+    if csv_path is None:
+        csv_path = scaled_path = scaled_csv('dataset.csv', size_mb)
+    try:
+        print(f"-- formats ({os.path.getsize(csv_path) / 1024 / 1024:.0f} MiB export)")
+        seconds = timed(detect_format, csv_path, repeat=20)
+        report("detect_format", seconds, detect_format(csv_path).name)
+
+        adapters = [scanner_format.module for scanner_format in SCANNER_FORMATS]
+        code = (
+            "import sys, logging; logging.disable(logging.INFO); import script5; "
+            f"script5.load_grouped_vulnerabilities({csv_path!r}); "
+            f"print(','.join(m for m in {adapters!r} if m in sys.modules))"
+        )
+        loaded = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True).stdout.strip()
+        print(f"adapters imported for a Nessus CSV: {loaded}")
+
+        for module in adapters:
+            code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True).stdout
+            report(f"import {module}", float(output), "fresh interpreter")
+    finally:
+        if scaled_path:
+            os.remove(scaled_path)
+
+
+def bench_check(csv_path=None, size_mb=100):
+    """The --check preflight against a full ingest of the same export."""
+    from scan_check import check_scan
+
+    script5 = quiet_script5()
+    scaled_path = None
+    if csv_path is None:
+        csv_path = scaled_path = scaled_csv('dataset.csv', size_mb)
+    try:
+        size = os.path.getsize(csv_path) / 1024 / 1024
+        print(f"-- check ({size:.0f} MiB export)")
+        checks = []
+        seconds = timed(lambda: checks.append(check_scan(csv_path)), repeat=3)
+        check = checks[-1]
+        report("check_scan", seconds, f"{size / seconds:.0f} MiB/s, {check.rows} rows, {check.plugins} plugins")
+        seconds = timed(script5.load_grouped_vulnerabilities, csv_path, repeat=3)
+        report("load_grouped_vulnerabilities", seconds, f"{size / seconds:.0f} MiB/s")
+    finally:
+        if scaled_path:
+            os.remove(scaled_path)
+
+
+def bench_watch(findings=500, size_mb=100):
+    """Watch mode: parsing an append against a full parse, and an incremental re-render against a full one."""
+    import watch
+
+    script5 = quiet_script5()
+    csv_path = scaled_csv('dataset.csv', size_mb)
+    try:
+        print(f"-- watch ({size_mb} MiB export, {findings} findings)")
+        with open('dataset.csv', 'rb') as source:
+            source.readline()
+            appended_rows = source.read()
+        scan = watch.WatchedScan(csv_path)
+        start = time.perf_counter()
+        scan.update()
+        report("WatchedScan.update, first parse", time.perf_counter() - start)
+        with open(csv_path, 'ab') as scaled:
+            scaled.write(appended_rows)
+        start = time.perf_counter()
+        scan.update()
+        report("WatchedScan.update, append", time.perf_counter() - start, f"{len(appended_rows) / 1024:.0f} KiB appended")
+    finally:
+        os.remove(csv_path)
+
+    grouped = synthetic_findings(findings)
+    incremental = watch.IncrementalReport()
+    seconds = timed(lambda: watch.IncrementalReport().update(grouped), repeat=1)
+    report("full render", seconds)
+    incremental.update(grouped)
+
+    # One new host on the last finding and one new finding, as an append to the export would give
+    changed = {name: dict(finding, affected_resource=set(finding['affected_resource'])) for name, finding in grouped.items()}
+    last = next(reversed(changed.values()))
+    last['affected_resource'].add('10.255.255.1:8443')
+    changed['Appended finding'] = dict(last, name='Appended finding', finding_id=f"ABCXYZ-{findings + 1}")
+    start = time.perf_counter()
+    rendered = incremental.update(changed)
+    report("IncrementalReport.update, append", time.perf_counter() - start, f"{rendered} findings rendered")
+    with tempfile.TemporaryDirectory() as save_dir:
+        seconds = timed(incremental.save, os.path.join(save_dir, 'watch.docx'), repeat=3)
+    report("IncrementalReport.save", seconds)
+
+
+def bench_service(reports=5, rows=10):
+    """Per-report cost of a fresh `vapt_report render` process against a request to the warm service."""
+    import csv
+    import subprocess
+    import threading
+    import urllib.request
+
+    import service
+
+    quiet_script5()  # Before the workers fork, so they inherit the quiet logging
+    reports, rows = int(reports), int(rows)
+    with tempfile.TemporaryDirectory() as work_dir:
+        scan_path = os.path.join(work_dir, 'scan.csv')
+        with open('dataset.csv', newline='', encoding='utf-8') as source, \
+                open(scan_path, 'w', newline='', encoding='utf-8') as scan:
+            writer = csv.writer(scan)
+            for count, row in enumerate(csv.reader(source)):
+                if count > rows:
+                    break
+                writer.writerow(row)
+        with open(scan_path, 'rb') as scan:
+            upload = scan.read()
+        print(f"-- service ({reports} reports, {rows} rows each)")
+
+        command = [sys.executable, '-m', 'vapt_report', 'render', scan_path, '--no-cache', '--no-tracker',
+                   '--output', os.path.join(work_dir, 'cli.docx')]
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        start = time.perf_counter()
+        for _ in range(reports):
+            subprocess.run(command, cwd=work_dir, env=env, stdout=subprocess.DEVNULL, check=True)
+        report("subprocess per report", (time.perf_counter() - start) / reports)
+
+        start = time.perf_counter()
+        server = service.ReportService(('127.0.0.1', 0), workers=1, work_dir=work_dir)
+        report("service start", time.perf_counter() - start, "workers fork from this already warm process")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/render"
+        try:
+            start = time.perf_counter()
+            for _ in range(reports):
+                with urllib.request.urlopen(urllib.request.Request(url, data=upload)) as response:
+                    size = len(response.read())
+            report("service request per report", (time.perf_counter() - start) / reports, f"{size / 1024:.0f} KiB docx")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+HEAVY_MODULES = ('docx', 'lxml', 'psycopg2', 'script5')
+
+
+def _importtime(argv):
+    """Wall time of a fresh interpreter running argv, its total import time and the heavy modules it imported."""
+    import subprocess
+
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *argv], capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    imports = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'self [us]' not in line:
+            self_us, _, name = line[len('import time:'):].split('|')
+            imports += int(self_us)
+            modules.add(name.strip())
+    return seconds, imports / 1e6, [module for module in HEAVY_MODULES if module in modules]
+
+
+def bench_startup(repeat=5):
+    """Startup of quick CLI invocations against importing the whole pipeline, from -X importtime."""
+    commands = [
+        ['-m', 'vapt_report', '--help'],
+        ['-m', 'vapt_report', 'render', '--help'],
+        ['-m', 'vapt_report', 'import', '--help'],
+        ['-m', 'vapt_report', 'db', '--help'],
+        ['-c', 'import script5'],
+        ['-c', 'pass'],
+    ]
+    print("-- startup")
+    for argv in commands:
+        runs = [_importtime(argv) for _ in range(int(repeat))]
+        seconds, imports, heavy = min(runs)
+        report(' '.join(argv[1:]), seconds, f"imports {imports * 1000:.1f} ms, heavy: {', '.join(heavy) or '-'}")
+
+
+BENCHMARKS = {
+    'theme': bench_theme,
+    'pagination': bench_pagination,
+    'save': bench_save,
+    'summary': bench_summary,
+    'csv': bench_csv,
+    'nessus': bench_nessus,
+    'cache': bench_cache,
+    'store': bench_store,
+    'delta': bench_delta,
+    'tracker': bench_tracker,
+    'html': bench_html,
+    'formats': bench_formats,
+    'startup': bench_startup,
+    'check': bench_check,
+    'watch': bench_watch,
+    'service': bench_service,
+}
+
+
+def main(argv):
+    names = argv or list(BENCHMARKS)
+    for name in names:
+        name, _, argument = name.partition('=')
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}', choose from: {', '.join(BENCHMARKS)}")
+            return 1
+        if argument:
+            BENCHMARKS[name](argument)
+        else:
+            BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
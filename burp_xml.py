@@ -0,0 +1,53 @@
+import logging
+import re
+from html import unescape
+from urllib.parse import urlsplit
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+_BLOCK = re.compile(r'<(?:br|/p|/li|/h\d|/div)\b[^>]*>', re.IGNORECASE)
+_TAG = re.compile(r'<[^>]+>')
+_SPACE = re.compile(r'[ \t]+')
+_DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def _text(html):
+    # Burp writes its advisory text as HTML fragments
+    text = unescape(_TAG.sub(' ', _BLOCK.sub('\n', html or '')))
+    return '\n'.join(line for line in (_SPACE.sub(' ', line).strip() for line in text.splitlines()) if line)
+
+
+def _issue_row(issue):
+    host = issue.find('host')
+    url = urlsplit(host.text or '') if host is not None else urlsplit('')
+    return {
+        'plugin_id': f"burp:{issue.findtext('type', '')}",
+        'name': issue.findtext('name', ''),
+        'description': _text(issue.findtext('issueBackground') or issue.findtext('issueDetail')),
+        'cvs_score': '',
+        'risk_factor': issue.findtext('severity', ''),
+        'host': url.hostname or (host.get('ip', '') if host is not None else ''),
+        'port': str(url.port or _DEFAULT_PORTS.get(url.scheme, '')),
+        'mitigation': _text(issue.findtext('remediationBackground') or issue.findtext('remediationDetail')),
+        # Left as HTML, the reference parser takes the URLs from the links
+        'references': issue.findtext('references', ''),
+        'protocol': 'tcp',
+        'tool': 'Burp Suite',
+    }
+
+
+def iter_rows(burp_path):
+    """Finding rows of a Burp Suite XML issues export, one per <issue>, streamed like .nessus files."""
+    issues = 0
+    context = etree.iterparse(burp_path, events=('end',), tag='issue', huge_tree=True)
+    for _, issue in context:
+        issues += 1
+        yield _issue_row(issue)
+        issue.clear(keep_tail=False)
+        while issue.getprevious() is not None:
+            del issue.getparent()[0]
+
+    del context
+    logger.info(f"Read {issues} issues from {burp_path}")
@@ -0,0 +1,206 @@
+import logging
+import mmap
+import os
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+_QUOTE = 0x22  # '"'
+_BOM = b'\xef\xbb\xbf'
+
+# One field: a quoted field ("" escapes included) or plain bytes. Both patterns are unrolled loops
+# rather than possessive quantifiers (Python 3.11+), every shorter run fails on its next byte,
+# so a record that doesn't match is given up in linear time
+_FIELD = rb'"[^"]*(?:""[^"]*)*"|[^",\r\n]*'
+# Whatever follows the last projected field up to the end of the record, quoted newlines included
+_REST = rb'[^"\n]*(?:"[^"]*"[^"\n]*)*(?:\n|\Z)'
+# End of a record that must have no further fields
+_END = rb'\r?(?:\n|\Z)'
+
+
+def split_record(record):
+    """Split one CSV record (bytes, no line terminator) into raw byte fields, honouring quotes."""
+    if b'"' not in record:
+        return record.split(b',')
+
+    fields = []
+    i = 0
+    length = len(record)
+    while True:
+        if i < length and record[i] == _QUOTE:
+            # Quoted field, a doubled quote is an escaped quote
+            j = i + 1
+            while True:
+                j = record.find(b'"', j)
+                if j == -1:
+                    j = length  # Unterminated quote, take the rest of the record
+                    break
+                if record[j + 1:j + 2] == b'"':
+                    j += 2
+                    continue
+                break
+            fields.append(record[i + 1:j].replace(b'""', b'"').replace(b'\r\n', b'\n'))
+            comma = record.find(b',', j + 1)
+            if comma == -1:
+                break
+            i = comma + 1
+        else:
+            comma = record.find(b',', i)
+            if comma == -1:
+                fields.append(record[i:])
+                break
+            fields.append(record[i:comma])
+            i = comma + 1
+    return fields
+
+
+def iter_raw_records(buffer, start=0, end=None):
+    """
+    Yield (offset, next_offset, record) for each record in buffer[start:end], where a record
+    ends at the first newline outside quotes. start must be the beginning of a record.
+    """
+    end = len(buffer) if end is None else end
+    position = start
+    while position < end:
+        newline = buffer.find(b'\n', position, len(buffer))
+        stop = len(buffer) if newline == -1 else newline
+
+        # An odd number of quotes means the newline is inside a quoted field
+        quotes = buffer[position:stop].count(b'"')
+        while quotes % 2 and stop < len(buffer):
+            newline = buffer.find(b'\n', stop + 1)
+            next_stop = len(buffer) if newline == -1 else newline
+            quotes += buffer[stop:next_stop].count(b'"')
+            stop = next_stop
+
+        record = buffer[position:stop]
+        if record.endswith(b'\r'):
+            record = record[:-1]
+        if record:
+            yield position, stop + 1, record
+        position = stop + 1
+
+
+def read_header(csv_path, encoding='utf-8', errors='strict'):
+    """Column names of the CSV and the byte offset where the first data record starts."""
+    with open(csv_path, 'rb') as csv_file:
+        if os.fstat(csv_file.fileno()).st_size == 0:
+            return [], 0
+        with mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            start = len(_BOM) if buffer[:len(_BOM)] == _BOM else 0
+            for _, data_start, record in iter_raw_records(buffer, start):
+                return [field.decode(encoding, errors) for field in split_record(record)], data_start
+    return [], 0
+
+
+@lru_cache(maxsize=32)
+def compile_projection(columns, column_count=None):
+    """
+    Regex matching a whole record that captures only the given columns, plus the order that
+    maps its groups (in column order) back to the order of columns. With column_count the
+    record must have exactly that many fields, otherwise anything after the last column matches.
+    """
+    wanted = sorted(set(columns))
+    count = wanted[-1] + 1 if column_count is None else column_count
+    fields = [(b'(%s)' if index in wanted else b'(?:%s)') % _FIELD for index in range(count)]
+    rest = _REST if column_count is None else _END
+    return re.compile(b','.join(fields) + rest), tuple(wanted.index(column) for column in columns)
+
+
+def unquote_field(field):
+    """Raw bytes of a field captured by compile_projection, without its quotes."""
+    if field[:1] == b'"':
+        return field[1:-1].replace(b'""', b'"').replace(b'\r\n', b'\n')
+    return field
+
+
+def iter_projected_rows(csv_path, columns, encoding='utf-8', errors='ignore', start=None, end=None):
+    """
+    Yield a tuple per data row with only the given column indices decoded.
+    The file is memory mapped and each record is matched in the byte buffer by one regex
+    that stops after the last projected column, so other columns are never copied or decoded.
+    Records the regex can't match (short or malformed rows) go through split_record.
+    start/end restrict the rows to the records starting in that byte range, start must be
+    a record start (see split_ranges); by default every data row is read.
+    """
+    if start is None:
+        _, start = read_header(csv_path, encoding, errors)
+    match, order = compile_projection(tuple(columns))
+    match = match.match
+    last_column = max(columns)
+    with open(csv_path, 'rb') as csv_file:
+        if os.fstat(csv_file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            logger.info(f"Memory mapped {len(buffer)} bytes of {csv_path}")
+            end = len(buffer) if end is None else end
+            position = start
+            row_count = 0
+            while position < end:
+                row_count += 1
+                record = match(buffer, position)
+                if record is not None:
+                    fields = record.groups()
+                    yield tuple(unquote_field(fields[index]).decode(encoding, errors) for index in order)
+                    position = record.end()
+                    continue
+
+                for _, position, raw in iter_raw_records(buffer, position):
+                    break
+                else:
+                    return
+                fields = split_record(raw)
+                if len(fields) <= last_column:
+                    logger.warning(f"Skipping row {row_count} due to missing or invalid data")
+                    continue
+                yield tuple(fields[index].decode(encoding, errors) for index in columns)
+
+
+def count_quotes(csv_path, start, end):
+    """Number of quote bytes in csv_path[start:end]."""
+    with open(csv_path, 'rb') as csv_file:
+        with mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return buffer[start:end].count(b'"')
+
+
+def _next_record_start(buffer, offset, in_quotes):
+    """First record start at or after offset, given whether offset lies inside a quoted field."""
+    if offset and buffer[offset - 1:offset] == b'\n' and not in_quotes:
+        return offset
+    position = offset
+    while True:
+        newline = buffer.find(b'\n', position)
+        if newline == -1:
+            return len(buffer)
+        if buffer[position:newline].count(b'"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            return newline + 1
+        position = newline + 1
+
+
+def split_ranges(csv_path, parts, map_function=map):
+    """
+    Split the data rows into at most parts byte ranges that each start on a record boundary.
+    Quotes are counted per range (through map_function, e.g. a process pool's map), their
+    prefix sums give the quote state at every cut, and each cut moves forward to the first
+    newline outside quotes, so quoted newlines never split a record.
+    """
+    _, data_start = read_header(csv_path)
+    size = os.path.getsize(csv_path)
+    if size <= data_start:
+        return []
+    span = max(1, -(-(size - data_start) // max(1, parts)))
+    cuts = list(range(data_start, size, span)) + [size]
+
+    counts = list(map_function(count_quotes, [csv_path] * (len(cuts) - 1), cuts[:-1], cuts[1:]))
+    starts = [data_start]
+    quotes = 0
+    with open(csv_path, 'rb') as csv_file:
+        with mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for cut, count in zip(cuts[1:-1], counts):
+                quotes += count
+                starts.append(max(starts[-1], _next_record_start(buffer, cut, quotes % 2 == 1)))
+    starts.append(size)
+    return [(start, end) for start, end in zip(starts, starts[1:]) if start < end]
@@ -0,0 +1,56 @@
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Every (Plugin ID, host, port) of a scan in scan order, the first row of each plugin
+# (for its text) and the 1-based finding number of each vulnerability name
+ScanIndex = namedtuple('ScanIndex', ['keys', 'plugins', 'finding_numbers'])
+
+# Keys of each delta group, in the order they appear in their scan, and the vulnerability
+# names of the persisting keys, which is what a persisting finding is counted by
+ScanDelta = namedtuple('ScanDelta', ['new', 'resolved', 'persisting', 'persisting_names'])
+
+
+def index_scan(rows):
+    """Hash every row of a scan by (Plugin ID, host, port)."""
+    keys = {}
+    plugins = {}
+    finding_numbers = {}
+    for row in rows:
+        plugin_id = row['plugin_id']
+        name = row['name']
+        key = (plugin_id, row['host'], row['port'])
+        if key not in keys:
+            keys[key] = name
+        if plugin_id not in plugins:
+            plugins[plugin_id] = row
+        if name not in finding_numbers:
+            finding_numbers[name] = len(finding_numbers) + 1
+    return ScanIndex(keys, plugins, finding_numbers)
+
+
+def diff_scans(previous, current):
+    """
+    New, resolved and persisting keys between two indexed scans. The differences are
+    set operations on the hashed keys, the result keeps the order of each scan.
+    """
+    new = current.keys.keys() - previous.keys.keys()
+    resolved = previous.keys.keys() - current.keys.keys()
+    persisting = [key for key in current.keys if key not in new]
+    delta = ScanDelta(
+        new=[key for key in current.keys if key in new],
+        resolved=[key for key in previous.keys if key in resolved],
+        persisting=persisting,
+        persisting_names=list(dict.fromkeys(current.keys[key] for key in persisting)),
+    )
+    logger.info(f"Scan delta: {len(delta.new)} new, {len(delta.resolved)} resolved, "
+                f"{len(delta.persisting)} persisting")
+    return delta
+
+
+def delta_rows(index, keys):
+    """Row dicts for the given keys of an indexed scan, with the plugin text of its first row."""
+    for key in keys:
+        plugin_id, host, port = key
+        yield {**index.plugins[plugin_id], 'name': index.keys[key], 'host': host, 'port': port}
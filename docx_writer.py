@@ -0,0 +1,73 @@
+import logging
+import zipfile
+
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+
+logger = logging.getLogger(__name__)
+
+# Deflate level per output profile: "fast" for drafts, "max" for delivery
+COMPRESSION_LEVELS = {
+    "store": None,
+    "fast": 1,
+    "default": 6,
+    "max": 9,
+}
+
+# Parts the renderer never changes once the styles are themed
+STATIC_PARTS = (
+    '/word/styles.xml',
+    '/word/stylesWithEffects.xml',
+    '/word/theme/theme1.xml',
+    '/word/numbering.xml',
+    '/word/fontTable.xml',
+    '/word/webSettings.xml',
+)
+
+_static_part_cache = {}  # static_key -> {partname: serialized blob}, for this process only
+
+
+def save_document(doc, path_or_stream, compression="default", static_key=None):
+    """
+    Save the document like doc.save, with a chosen deflate level.
+    When static_key is given, the static parts (styles, theme, numbering, ...) are
+    taken from the in-process cache instead of being serialized again. The key must
+    change whenever anything that shapes those parts changes, e.g. the template or
+    the fonts. Nothing is kept on disk, a stale styles.xml can't outlive the code
+    that produced it.
+    """
+    if compression not in COMPRESSION_LEVELS:
+        raise ValueError(f"Unknown compression '{compression}', choose from: {', '.join(COMPRESSION_LEVELS)}")
+    level = COMPRESSION_LEVELS[compression]
+    method = zipfile.ZIP_STORED if level is None else zipfile.ZIP_DEFLATED
+    logger.info(f"Saving document with '{compression}' compression")
+
+    package = doc.part.package
+    parts = list(package.parts)
+    for part in parts:
+        part.before_marshal()
+
+    cached = _static_part_cache.get(static_key, {}) if static_key else {}
+    fresh = {}
+    reused = 0
+
+    with zipfile.ZipFile(path_or_stream, 'w', compression=method, compresslevel=level) as package_zip:
+        package_zip.writestr(CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob)
+        package_zip.writestr(PACKAGE_URI.rels_uri.membername, package.rels.xml)
+        for part in parts:
+            partname = str(part.partname)
+            if static_key and partname in STATIC_PARTS:
+                blob = cached.get(partname)
+                if blob is None:
+                    blob = fresh[partname] = part.blob
+                else:
+                    reused += 1
+            else:
+                blob = part.blob
+            package_zip.writestr(part.partname.membername, blob)
+            if len(part.rels):
+                package_zip.writestr(part.partname.rels_uri.membername, part.rels.xml)
+
+    if fresh:
+        _static_part_cache[static_key] = {**cached, **fresh}
+    logger.info(f"Document saved, {len(parts)} parts ({reused} static parts from cache)")
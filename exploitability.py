@@ -0,0 +1,43 @@
+import logging
+from enum import IntEnum
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Exploit framework columns of the Nessus export, in the order they are listed in the report
+EXPLOIT_FRAMEWORKS = (
+    ('metasploit', 'Metasploit'),
+    ('core_impact', 'Core Impact'),
+    ('canvas', 'CANVAS'),
+)
+
+_TRUE = {'true', 'yes', 'y', '1'}
+
+
+class Exploitability(IntEnum):
+    LOCAL = 0  # Port 0 or no port, found by a local or credentialed check, no exploit framework module
+    REMOTE = 1  # Reported on a port (TCP, UDP, ICMP, ...), no exploit framework module
+    EXPLOIT_AVAILABLE = 2  # Weaponised in an exploit framework, whichever way it was found
+
+
+@lru_cache(maxsize=None)
+def classify_exploitability(port, metasploit='', core_impact='', canvas=''):
+    """
+    (Exploitability, cell text) of one row. Rows only differ in a handful of
+    port/flag combinations, so the cache answers almost every call.
+    """
+    # A framework module outranks the port: port 0 only says how Nessus found the flaw
+    flags = (metasploit, core_impact, canvas)
+    frameworks = [label for (_, label), flag in zip(EXPLOIT_FRAMEWORKS, flags) if flag.strip().lower() in _TRUE]
+    if frameworks:
+        return Exploitability.EXPLOIT_AVAILABLE, f"Yes ({', '.join(frameworks)})"
+    if port.strip() in ('', '0'):
+        return Exploitability.LOCAL, "Local check"
+    return Exploitability.REMOTE, "Yes"
+
+
+def classify_row(row):
+    """Classify a grouped-ingest row dict, missing optional columns count as empty."""
+    return classify_exploitability(
+        row.get('port', ''), *(row.get(field, '') for field, _ in EXPLOIT_FRAMEWORKS),
+    )
@@ -0,0 +1,162 @@
+import logging
+import sqlite3
+from datetime import datetime
+
+from severity import Severity
+
+logger = logging.getLogger(__name__)
+
+FINDINGS_DB_PATH = 'findings.db'
+
+# Rows per executemany call while importing
+IMPORT_BATCH_SIZE = 10000
+
+# PRAGMA user_version of the schema, a later schema change can tell stores of this one apart
+STORE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    scan_id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    digest TEXT NOT NULL UNIQUE,
+    imported_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS plugins (
+    scan_id INTEGER NOT NULL REFERENCES scans (scan_id) ON DELETE CASCADE,
+    plugin_id TEXT NOT NULL,
+    tool TEXT NOT NULL DEFAULT 'Nessus',
+    description TEXT NOT NULL DEFAULT '',
+    cvss3 TEXT NOT NULL DEFAULT '',
+    risk_factor TEXT NOT NULL DEFAULT '',
+    severity INTEGER NOT NULL DEFAULT 0,
+    solution TEXT NOT NULL DEFAULT '',
+    see_also TEXT NOT NULL DEFAULT '',
+    metasploit TEXT NOT NULL DEFAULT '',
+    core_impact TEXT NOT NULL DEFAULT '',
+    canvas TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (scan_id, plugin_id)
+);
+CREATE TABLE IF NOT EXISTS scan_rows (
+    scan_id INTEGER NOT NULL REFERENCES scans (scan_id) ON DELETE CASCADE,
+    plugin_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    host TEXT NOT NULL,
+    port TEXT NOT NULL,
+    protocol TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS scan_rows_plugin ON scan_rows (scan_id, plugin_id);
+CREATE INDEX IF NOT EXISTS scan_rows_host ON scan_rows (scan_id, host);
+CREATE INDEX IF NOT EXISTS plugins_severity ON plugins (scan_id, severity);
+"""
+
+_INSERT_ROWS = "INSERT INTO scan_rows (scan_id, plugin_id, name, host, port, protocol) VALUES (?, ?, ?, ?, ?, ?)"
+
+_PLUGIN_QUERY = """
+SELECT plugin_id, tool, description, cvss3, risk_factor, solution, see_also, metasploit, core_impact, canvas
+FROM plugins WHERE scan_id = ?
+"""
+
+_ROW_QUERY = """
+SELECT r.name, r.plugin_id, r.host, r.port, r.protocol
+FROM scan_rows r JOIN plugins p ON p.scan_id = r.scan_id AND p.plugin_id = r.plugin_id
+WHERE r.scan_id = ?
+"""
+
+
+def connect_store(db_path=FINDINGS_DB_PATH):
+    """Open the findings store in WAL mode, creating its tables on first use."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(_SCHEMA)
+    conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    return conn
+
+
+def find_scan(conn, digest):
+    """scan_id of an already imported scan file, or None."""
+    row = conn.execute("SELECT scan_id FROM scans WHERE digest = ?", (digest,)).fetchone()
+    return row[0] if row else None
+
+
+def latest_scan(conn):
+    """scan_id of the most recent import, or None when the store is empty."""
+    row = conn.execute("SELECT MAX(scan_id) FROM scans").fetchone()
+    return row[0]
+
+
+def import_scan(conn, source, digest, rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Store the row dicts of one scan and return its scan_id. The whole import is one
+    transaction with batched executemany calls, plugin text is stored once per plugin
+    of the scan, so later imports never change how an earlier scan renders.
+    A scan whose digest is already stored is not imported again.
+    """
+    scan_id = find_scan(conn, digest)
+    if scan_id is not None:
+        logger.info(f"{source} is already in the findings store as scan {scan_id}")
+        return scan_id
+
+    row_count = 0
+    with conn:
+        scan_id = conn.execute(
+            "INSERT INTO scans (source, digest, imported_at) VALUES (?, ?, ?)",
+            (source, digest, datetime.now().isoformat(timespec='seconds')),
+        ).lastrowid
+
+        plugins = {}
+        batch = []
+        for row in rows:
+            plugin_id = row['plugin_id']
+            if plugin_id not in plugins:
+                plugins[plugin_id] = (
+                    scan_id, plugin_id, row.get('tool', 'Nessus'), row['description'], row['cvs_score'], row['risk_factor'],
+                    int(Severity.from_risk(row['risk_factor'])), row['mitigation'], row['references'],
+                    row.get('metasploit', ''), row.get('core_impact', ''), row.get('canvas', ''),
+                )
+            batch.append((scan_id, plugin_id, row['name'], row['host'], row['port'], row.get('protocol', '')))
+            if len(batch) >= batch_size:
+                conn.executemany(_INSERT_ROWS, batch)
+                row_count += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(_INSERT_ROWS, batch)
+            row_count += len(batch)
+
+        conn.executemany("INSERT INTO plugins VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", plugins.values())
+        conn.execute("UPDATE scans SET row_count = ? WHERE scan_id = ?", (row_count, scan_id))
+
+    logger.info(f"Imported {row_count} rows ({len(plugins)} plugins) of {source} as scan {scan_id}")
+    return scan_id
+
+
+def iter_store_rows(conn, scan_id, min_severity=None, host=None, plugin_id=None):
+    """
+    Yield the row dicts of a stored scan in import order, filtered in SQL through the
+    plugin, host and severity indexes. The dicts have the keys script5's grouping expects.
+    Plugin text is fetched once per plugin, not once per row.
+    """
+    plugins = {
+        plugin_id: dict(zip(('tool', 'description', 'cvs_score', 'risk_factor', 'mitigation', 'references',
+                             'metasploit', 'core_impact', 'canvas'), text))
+        for plugin_id, *text in conn.execute(_PLUGIN_QUERY, (scan_id,))
+    }
+
+    query = _ROW_QUERY
+    parameters = [scan_id]
+    if min_severity is not None:
+        query += " AND p.severity >= ?"
+        parameters.append(int(min_severity))
+    if host is not None:
+        query += " AND r.host = ?"
+        parameters.append(host)
+    if plugin_id is not None:
+        query += " AND r.plugin_id = ?"
+        parameters.append(plugin_id)
+    query += " ORDER BY r.rowid"
+
+    for name, plugin_id, host, port, protocol in conn.execute(query, parameters):
+        yield {'name': name, 'plugin_id': plugin_id, 'host': host, 'port': port, 'protocol': protocol,
+               **plugins[plugin_id]}
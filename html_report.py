@@ -0,0 +1,128 @@
+import logging
+from html import escape
+
+from knowledge_base import join_knowledge_base
+from resources import RESOURCE_SUMMARY_THRESHOLD, compact_resources
+from severity import SEVERITY_STYLES
+
+logger = logging.getLogger(__name__)
+
+HTML_PATH = 'output_document.html'
+
+# Findings per write to the output file
+HTML_FLUSH_EVERY = 500
+
+# Same cell colors as the Word report, one CSS class per severity tier
+_SEVERITY_CSS = "\n".join(
+    f".sev-{int(severity)} {{ background: #{style.fill}; color: #{style.text_color}; }}"
+    for severity, style in SEVERITY_STYLES.items() if style.fill
+)
+
+_PAGE_START = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; font-size: 10.5pt; margin: 2em; }}
+h1 {{ text-align: center; }}
+h2 {{ color: #365F91; font-size: 11pt; margin: 2em 0 0; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border: 1px solid #000; padding: 4px 6px; text-align: left; vertical-align: top; }}
+th {{ background: #C0D4EC; }}
+.resources {{ columns: 2; margin: 0; padding: 0; list-style: none; }}
+{severity_css}
+</style></head><body>
+<h1>{title}</h1>
+<table class="summary"><tr><th>Risk Rating</th><th>Findings</th></tr>{summary}</table>
+"""
+
+# One finding, laid out like the tables create_table builds
+_FINDING = """<h2 id="{finding_id}">{number}. {name}</h2>
+<table>
+<tr><th>Finding ID</th><th colspan="2">Description</th></tr>
+<tr><td>{finding_id}</td><td colspan="2">During Vulnerability assessment and Penetration testing we observed that, {description}</td></tr>
+<tr><th>CVS Score</th><th>Risk Rating</th><th>Remote Exploitability</th></tr>
+<tr><td>{cvs_score}</td><td class="sev-{severity}">{risk}</td><td>{remote_exploitability}</td></tr>
+<tr><th colspan="2">Affected Resource</th><th>Module Name</th></tr>
+<tr><td colspan="2">{resources}</td><td>{module}</td></tr>
+<tr><th colspan="3">Security Risk</th></tr>
+<tr><td colspan="3">{security_risk}</td></tr>
+<tr><th>Business Impact</th><td colspan="2">{business_impact}</td></tr>
+<tr><th colspan="3">Workaround / Mitigation</th></tr>
+<tr><td colspan="3">{mitigation}</td></tr>
+<tr><th colspan="2">Tool used</th><th>References</th></tr>
+<tr><td colspan="2">{tool}</td><td>{references}</td></tr>
+<tr><th colspan="3">Proof of Concept (POC)</th></tr>
+<tr><td colspan="3"><br><b>Figure 1</b> - Shows </td></tr>
+</table>
+"""
+
+_PAGE_END = "</body></html>\n"
+
+
+def _text(value):
+    return escape(value or "").replace("\n", "<br>")
+
+
+def _resources_html(resources, threshold=RESOURCE_SUMMARY_THRESHOLD):
+    compacted = compact_resources(resources)
+    items = "".join(f"<li>{escape(resource)}</li>" for resource in compacted)
+    if len(compacted) > threshold:
+        return f'<details><summary>{len(compacted)} affected resources</summary><ul class="resources">{items}</ul></details>'
+    return f'<ul class="resources">{items}</ul>'
+
+
+def finding_html(number, heading, finding, module_name=""):
+    """HTML of one grouped finding, with the fields append_data writes into the Word tables."""
+    join_knowledge_base(finding)
+    resources = finding['affected_resource']
+    if isinstance(resources, str):
+        resources = resources.split('\n')
+    severity = finding['severity']
+    mitigation = finding.get('curated_mitigation') or f"It is recommended: \n-To {finding['mitigation']}"
+    return _FINDING.format(
+        number=number,
+        name=escape(heading),
+        finding_id=escape(finding['finding_id']),
+        description=_text(finding['description']),
+        cvs_score=escape(finding['cvs_score']),
+        severity=int(severity),
+        risk=severity.label,
+        remote_exploitability=escape(finding.get('remote_exploitability', "Yes")),
+        resources=_resources_html(resources),
+        module=escape(module_name),
+        tool=escape(finding.get('tool', "Nessus")),
+        security_risk=_text(finding.get('security_risk')),
+        business_impact=_text(finding.get('business_impact')),
+        mitigation=_text(mitigation),
+        references="<br>".join(
+            f'<a href="{escape(url, quote=True)}">{escape(url)}</a>' for url in finding['references']
+        ),
+    )
+
+
+def write_html_report(grouped_vulnerabilities, path=HTML_PATH, title="", module_name=None):
+    """
+    Write the findings as one HTML page, for previews. The page is built from
+    preformatted strings and written in chunks of HTML_FLUSH_EVERY findings.
+    module_name maps a finding name to its Module Name cell.
+    """
+    counts = {}
+    for finding in grouped_vulnerabilities.values():
+        counts[finding['severity']] = counts.get(finding['severity'], 0) + 1
+    summary = "".join(
+        f'<tr><td class="sev-{int(severity)}">{severity.label}</td><td>{counts[severity]}</td></tr>'
+        for severity in sorted(counts, reverse=True)
+    )
+
+    with open(path, 'w', encoding='utf-8') as html_file:
+        html_file.write(_PAGE_START.format(title=escape(title), severity_css=_SEVERITY_CSS, summary=summary))
+        chunk = []
+        for number, (heading, finding) in enumerate(grouped_vulnerabilities.items(), 1):
+            chunk.append(finding_html(number, heading, finding, module_name(finding['name']) if module_name else ""))
+            if len(chunk) >= HTML_FLUSH_EVERY:
+                html_file.write("".join(chunk))
+                chunk = []
+        chunk.append(_PAGE_END)
+        html_file.write("".join(chunk))
+
+    logger.info(f"Wrote {len(grouped_vulnerabilities)} findings to {path}")
+    return path
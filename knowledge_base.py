@@ -0,0 +1,97 @@
+import csv
+import logging
+import os
+import sqlite3
+from collections import namedtuple
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_BASE_PATH = 'knowledge_base.db'
+
+KnowledgeEntry = namedtuple('KnowledgeEntry', ['plugin_id', 'security_risk', 'business_impact', 'mitigation'])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plugin_text (
+    plugin_id TEXT PRIMARY KEY,
+    security_risk TEXT NOT NULL DEFAULT '',
+    business_impact TEXT NOT NULL DEFAULT '',
+    mitigation TEXT NOT NULL DEFAULT ''
+)
+"""
+
+
+def create_knowledge_base(db_path=KNOWLEDGE_BASE_PATH):
+    """Create the knowledge base file and its table if they don't exist yet."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(_SCHEMA)
+    logger.info(f"Knowledge base ready at {db_path}")
+
+
+def import_knowledge_base_csv(csv_path, db_path=KNOWLEDGE_BASE_PATH):
+    """
+    Load curated text from a CSV with 'Plugin ID', 'Security Risk', 'Business Impact'
+    and 'Mitigation' columns. Existing entries for the same plugin are replaced.
+    Other scanners' checks use their prefixed IDs, e.g. 'qualys:38173'.
+    """
+    create_knowledge_base(db_path)
+    with open(csv_path, 'r', encoding='utf-8', newline='') as csv_file:
+        rows = [
+            (row['Plugin ID'].strip(), row.get('Security Risk', ''), row.get('Business Impact', ''),
+             row.get('Mitigation', ''))
+            for row in csv.DictReader(csv_file)
+            if row.get('Plugin ID', '').strip()
+        ]
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO plugin_text (plugin_id, security_risk, business_impact, mitigation) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+    reload_knowledge_base()
+    logger.info(f"Imported {len(rows)} knowledge base entries from {csv_path}")
+    return len(rows)
+
+
+_connections = {}  # knowledge base path -> read-only connection
+
+
+def _connect(db_path):
+    """
+    One read-only connection per knowledge base file, opened on first use. A missing
+    file is not remembered, so a knowledge base created later is picked up.
+    """
+    conn = _connections.get(db_path)
+    if conn is None and os.path.exists(db_path):
+        conn = _connections[db_path] = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    return conn
+
+
+def reload_knowledge_base():
+    """Close the connections and forget cached lookups, the next lookup reads the file again."""
+    for conn in _connections.values():
+        conn.close()
+    _connections.clear()
+    lookup_plugin.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def lookup_plugin(plugin_id, db_path=KNOWLEDGE_BASE_PATH):
+    """Curated text of a plugin, or None when the knowledge base has no entry for it."""
+    conn = _connect(db_path)
+    if conn is None or not plugin_id:
+        return None  # No knowledge base file (yet), curated text is left empty
+    row = conn.execute(
+        "SELECT plugin_id, security_risk, business_impact, mitigation FROM plugin_text WHERE plugin_id = ?",
+        (str(plugin_id).strip(),),
+    ).fetchone()
+    return KnowledgeEntry(*row) if row else None
+
+
+def join_knowledge_base(finding, db_path=KNOWLEDGE_BASE_PATH):
+    """Fill the finding's security risk, business impact and curated mitigation from the knowledge base."""
+    entry = lookup_plugin(finding.get('plugin_id', ''), db_path)
+    finding['security_risk'] = entry.security_risk if entry else ""
+    finding['business_impact'] = entry.business_impact if entry else ""
+    finding['curated_mitigation'] = entry.mitigation if entry else ""
+    return finding
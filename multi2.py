@@ -1,9 +1,8 @@
-import psycopg2
-from psycopg2 import sql
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+# psycopg2 is imported by the functions that talk to the server, so the menu shows without it
 
 def connect_db(database_name=None):
     """Connect to the PostgreSQL database."""
+    import psycopg2
     try:
         conn = psycopg2.connect(
             dbname=database_name or "postgres",  
@@ -48,6 +47,10 @@ def get_table_columns(conn, table_name):
 
 def create_database():
     """Create a new database."""
+    import psycopg2
+    from psycopg2 import sql
+    from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
     db_name = input("Enter the name for the new database: ")
     
     try:
@@ -79,6 +82,8 @@ def create_database():
 
 def create_table(conn):
     """Create a new table in the selected database."""
+    from psycopg2 import sql
+
     table_name = input("Enter table name: ")
     columns = []
     
@@ -109,6 +114,8 @@ def create_table(conn):
 
 def insert_data(conn, table_name):
     """Insert data into a specified table."""
+    from psycopg2 import sql
+
     columns = get_table_columns(conn, table_name)
     values = []
     for col_name, col_type in columns:
@@ -134,6 +141,8 @@ def insert_data(conn, table_name):
 
 def update_data(conn, table_name):
     """Update data in a specified table."""
+    from psycopg2 import sql
+
     columns = get_table_columns(conn, table_name)
     primary_key = columns[0][0]
     record_id = input(f"Enter {primary_key} of the record to update: ")
@@ -168,6 +177,8 @@ def update_data(conn, table_name):
 
 def delete_data(conn, table_name):
     """Delete data from a specified table."""
+    from psycopg2 import sql
+
     columns = get_table_columns(conn, table_name)
     primary_key = columns[0][0]
     record_id = input(f"Enter {primary_key} of the record to delete: ")
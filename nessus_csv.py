@@ -0,0 +1,97 @@
+import csv
+import logging
+
+from csv_mmap import iter_projected_rows, read_header
+
+logger = logging.getLogger(__name__)
+
+# Nessus CSV column of each field of the finding schema (scanner_formats.FINDING_FIELDS)
+REQUIRED_FIELDS = {
+    'plugin_id': 'Plugin ID',
+    'name': 'Name',
+    'description': 'Description',
+    'cvs_score': 'CVSS v3.0 Base Score',
+    'risk_factor': 'Risk Factor',
+    'host': 'Host',
+    'port': 'Port',
+    'mitigation': 'Solution',
+    'references': 'See Also'
+}
+
+# Read when the export has them, they feed the exploitability classifier
+OPTIONAL_FIELDS = {
+    'protocol': 'Protocol',
+    'metasploit': 'Metasploit',
+    'core_impact': 'Core Impact',
+    'canvas': 'CANVAS'
+}
+
+
+def validate_csv_columns(column_map, required_fields):
+    """Validate if all required columns exist in the CSV file"""
+    logger.info("Validating CSV columns")
+    missing_fields = []
+    for field, column_name in required_fields.items():
+        if column_name not in column_map:
+            missing_fields.append(column_name)
+    
+    if missing_fields:
+        error_msg = f"Missing required columns in CSV: {', '.join(missing_fields)}"
+        logger.error(error_msg)
+        return False, error_msg
+    
+    logger.info("All required columns found in CSV")
+    return True, ""
+
+
+def projected_columns(header, required_fields=REQUIRED_FIELDS, optional_fields=OPTIONAL_FIELDS):
+    """
+    Validate the CSV header and return the field names and column indices to read:
+    every required field, then the optional fields the export has.
+    """
+    # Create a mapping of column names to indices
+    column_map = {}
+    for i, column_name in enumerate(header):
+        column_map[column_name] = i
+
+    # Validate CSV columns
+    valid, error_message = validate_csv_columns(column_map, required_fields)
+    if not valid:
+        logger.error(f"CSV validation failed: {error_message}")
+        logger.info(f"Available columns: {', '.join(column_map.keys())}")
+        raise ValueError(error_message)
+
+    fields = list(required_fields) + [field for field, column_name in optional_fields.items() if column_name in column_map]
+    columns = [column_map[required_fields.get(field) or optional_fields[field]] for field in fields]
+    return fields, columns
+
+
+def iter_required_fields(csv_file_path, required_fields=REQUIRED_FIELDS, reader="mmap"):
+    """Validate the CSV header and yield a dict of the required (and present optional) fields per row."""
+    if reader == "mmap":
+        header, _ = read_header(csv_file_path, errors='ignore')
+        logger.info(f"CSV header read successfully with {len(header)} columns")
+        fields, columns = projected_columns(header, required_fields)
+        for values in iter_projected_rows(csv_file_path, columns):
+            yield dict(zip(fields, values))
+        return
+
+    # utf-8-sig drops the BOM Excel puts before the first column name, as read_header does
+    with open(csv_file_path, 'r', encoding='utf-8-sig', errors='ignore') as csv_file:
+        logger.info("Successfully opened CSV file")
+        csv_reader = csv.reader(csv_file)
+        header = next(csv_reader, [])
+        logger.info(f"CSV header read successfully with {len(header)} columns")
+
+        fields, columns = projected_columns(header, required_fields)
+        last_column = max(columns)
+        for row_count, csv_row_data in enumerate(csv_reader, 1):
+            if len(csv_row_data) <= last_column:
+                logger.warning(f"Skipping row {row_count} due to missing or invalid data")
+                continue
+            yield {field: csv_row_data[i] for field, i in zip(fields, columns)}
+
+
+def iter_rows(csv_file_path, reader="mmap"):
+    """Finding rows of a Nessus CSV export."""
+    return iter_required_fields(csv_file_path, REQUIRED_FIELDS, reader)
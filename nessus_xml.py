@@ -0,0 +1,83 @@
+import logging
+
+from lxml import etree
+
+from nessus_csv import OPTIONAL_FIELDS, REQUIRED_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Where each CSV export column lives in a .nessus file: an attribute of ReportHost
+# ('host'), an attribute of ReportItem ('item') or a child element of ReportItem ('child')
+NESSUS_COLUMNS = {
+    'Plugin ID': ('item', 'pluginID'),
+    'Name': ('item', 'pluginName'),
+    'Host': ('host', 'name'),
+    'Protocol': ('item', 'protocol'),
+    'Port': ('item', 'port'),
+    'Risk Factor': ('child', 'risk_factor'),
+    'Synopsis': ('child', 'synopsis'),
+    'Description': ('child', 'description'),
+    'Solution': ('child', 'solution'),
+    'See Also': ('child', 'see_also'),
+    'Plugin Output': ('child', 'plugin_output'),
+    'CVE': ('child', 'cve'),
+    'CVSS v2.0 Base Score': ('child', 'cvss_base_score'),
+    'CVSS v3.0 Base Score': ('child', 'cvss3_base_score'),
+    'Metasploit': ('child', 'exploit_framework_metasploit'),
+    'Core Impact': ('child', 'exploit_framework_core'),
+    'CANVAS': ('child', 'exploit_framework_canvas'),
+}
+
+
+def _item_values(item, host_name, fields):
+    # Repeated children (several <cve> elements) are joined by newlines, like the CSV export
+    children = {}
+    for child in item:
+        if child.text is not None:
+            children.setdefault(child.tag, []).append(child.text)
+    values = []
+    for source, name in fields:
+        if source == 'host':
+            values.append(host_name)
+        elif source == 'item':
+            values.append(item.get(name, ''))
+        else:
+            values.append('\n'.join(children.get(name, ())))
+    return tuple(values)
+
+
+def iter_nessus_rows(nessus_path, columns):
+    """
+    Yield one tuple per ReportItem with the values of the given CSV column names.
+    The file is streamed with iterparse and every finished element is cleared and
+    detached, so memory stays flat however many hosts the scan has.
+    """
+    fields = [NESSUS_COLUMNS[column] for column in columns]
+    host_name = ''
+    items = 0
+    context = etree.iterparse(
+        nessus_path, events=('start', 'end'), tag=('ReportHost', 'ReportItem'), huge_tree=True
+    )
+    for event, element in context:
+        if event == 'start':
+            if element.tag == 'ReportHost':
+                host_name = element.get('name', '')
+            continue
+
+        if element.tag == 'ReportItem':
+            items += 1
+            yield _item_values(element, host_name, fields)
+
+        # Drop the finished element and everything before it (HostProperties, earlier items)
+        element.clear(keep_tail=False)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    del context
+    logger.info(f"Read {items} report items from {nessus_path}")
+
+
+def iter_rows(nessus_path):
+    """Finding rows of a .nessus export, with the same fields as a Nessus CSV export."""
+    fields = {**REQUIRED_FIELDS, **OPTIONAL_FIELDS}
+    return (dict(zip(fields, values)) for values in iter_nessus_rows(nessus_path, list(fields.values())))
@@ -0,0 +1,37 @@
+import csv
+import logging
+
+from scanner_formats import iter_mapped_rows
+
+logger = logging.getLogger(__name__)
+
+# OpenVAS / Greenbone CSV results export column of each finding field
+OPENVAS_FIELDS = {
+    'plugin_id': 'NVT OID',
+    'name': 'NVT Name',
+    'description': 'Summary',
+    'cvs_score': 'CVSS',
+    'risk_factor': 'Severity',
+    'host': 'IP',
+    'port': 'Port',
+    'mitigation': 'Solution',
+}
+
+OPENVAS_OPTIONAL_FIELDS = {
+    'references': 'Other References',
+    'protocol': 'Port Protocol',
+}
+
+
+def iter_rows(csv_path):
+    """Finding rows of an OpenVAS CSV results export, NVT OIDs become 'openvas:<OID>' plugin IDs."""
+    with open(csv_path, 'r', encoding='utf-8', errors='ignore', newline='') as csv_file:
+        csv_reader = csv.reader(csv_file)
+        header = next(csv_reader, [])
+        defaults = {'references': '', 'tool': 'OpenVAS'}
+        for row in iter_mapped_rows(csv_reader, header, OPENVAS_FIELDS, OPENVAS_OPTIONAL_FIELDS, defaults):
+            row['plugin_id'] = f"openvas:{row['plugin_id']}"
+            # Host-level results ('general/tcp') are port 0 in Nessus terms
+            if row['port'] == 'general':
+                row['port'] = '0'
+            yield row
@@ -0,0 +1,57 @@
+import csv
+import logging
+
+from scanner_formats import iter_mapped_rows
+
+logger = logging.getLogger(__name__)
+
+# Qualys vulnerability scan report (CSV) column of each finding field
+QUALYS_FIELDS = {
+    'plugin_id': 'QID',
+    'name': 'Title',
+    'description': 'Threat',
+    'risk_factor': 'Severity',
+    'host': 'IP',
+    'port': 'Port',
+    'mitigation': 'Solution',
+}
+
+QUALYS_OPTIONAL_FIELDS = {
+    'references': 'Vendor Reference',
+    'protocol': 'Protocol',
+    'exploitability': 'Exploitability',
+}
+
+# Newer reports score CVSS 3.1, older ones CVSS 3.0
+QUALYS_CVSS_COLUMNS = ('CVSS3.1 Base', 'CVSS3 Base', 'CVSS Base')
+
+# Qualys severity levels 1 (minimal) to 5 (urgent)
+QUALYS_SEVERITIES = {'5': 'Critical', '4': 'High', '3': 'Medium', '2': 'Low', '1': 'Info'}
+
+
+def _find_header(csv_reader):
+    # The column header follows a preamble of report and scan details
+    for row in csv_reader:
+        if 'QID' in row and 'Title' in row:
+            return row
+    return []
+
+
+def iter_rows(csv_path):
+    """Finding rows of a Qualys CSV scan report, QIDs become 'qualys:<QID>' plugin IDs."""
+    with open(csv_path, 'r', encoding='utf-8', errors='ignore', newline='') as csv_file:
+        csv_reader = csv.reader(csv_file)
+        header = _find_header(csv_reader)
+        optional_fields = dict(QUALYS_OPTIONAL_FIELDS)
+        cvss_column = next((column for column in QUALYS_CVSS_COLUMNS if column in header), None)
+        if cvss_column:
+            optional_fields['cvs_score'] = cvss_column
+
+        defaults = {'cvs_score': '', 'references': '', 'tool': 'Qualys'}
+        for row in iter_mapped_rows(csv_reader, header, QUALYS_FIELDS, optional_fields, defaults):
+            row['plugin_id'] = f"qualys:{row['plugin_id']}"
+            row['risk_factor'] = QUALYS_SEVERITIES.get(row['risk_factor'].strip(), row['risk_factor'])
+            # The Exploitability column names the frameworks with a public exploit
+            if 'metasploit' in row.pop('exploitability', '').lower():
+                row['metasploit'] = 'true'
+            yield row
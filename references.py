@@ -0,0 +1,99 @@
+import logging
+import re
+import weakref
+from urllib.parse import urlsplit, urlunsplit
+from xml.sax.saxutils import escape
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+logger = logging.getLogger(__name__)
+
+_URL = re.compile(r'https?://[^\s<>"]+', re.IGNORECASE)
+_TRAILING = '.,;:)]\'"'
+_BRACKETS = {')': '(', ']': '['}
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_references = {}  # plugin id -> normalized URLs
+_relationship_ids = weakref.WeakKeyDictionary()  # document part -> {url: rId}
+
+_HYPERLINK = (
+    '<w:hyperlink {} r:id="{}" w:history="1"><w:r><w:rPr><w:color w:val="0563C1"/>'
+    '<w:u w:val="single"/></w:rPr><w:t xml:space="preserve">{}</w:t></w:r></w:hyperlink>'
+)
+_LINE_BREAK = '<w:r {}><w:br/></w:r>'
+
+
+def _strip_trailing(url):
+    """Drop punctuation the URL pattern picked up after a URL, a closing bracket only when unbalanced."""
+    while url and url[-1] in _TRAILING:
+        closing = url[-1]
+        if closing in _BRACKETS and url.count(_BRACKETS[closing]) >= url.count(closing):
+            break  # Part of the URL, as in .../Foo_(bar) or http://[::1]
+        url = url[:-1]
+    return url
+
+
+def normalize_url(url):
+    """
+    Lowercase the scheme and host, drop default ports and trailing punctuation.
+    A URL urlsplit can't take apart (bad port, broken IPv6 literal) is kept as written.
+    """
+    url = _strip_trailing(url)
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f"[{host}]"  # IPv6 literal
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, parts.fragment))
+
+
+def parse_references(see_also, plugin_id=None):
+    """All distinct URLs of a 'See Also' field in their original order, parsed once per Plugin ID."""
+    if plugin_id is not None and plugin_id in _references:
+        return _references[plugin_id]
+
+    urls = []
+    seen = set()
+    for match in _URL.finditer(see_also or ''):
+        url = normalize_url(match.group(0))
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+    urls = tuple(urls)
+
+    if plugin_id is not None:
+        _references[plugin_id] = urls
+    return urls
+
+
+def clear_references():
+    """Forget the memoized references, e.g. between the jobs of a long-lived worker."""
+    _references.clear()
+
+
+def relationship_id(part, url):
+    """rId of the external hyperlink relationship, shared by every finding that links the URL."""
+    ids = _relationship_ids.setdefault(part, {})
+    rId = ids.get(url)
+    if rId is None:
+        rId = ids[url] = part.relate_to(url, RT.HYPERLINK, is_external=True)
+    return rId
+
+
+def add_reference_links(cell, urls):
+    """Write the URLs into the cell as clickable hyperlinks, one per line."""
+    paragraph = cell.paragraphs[0]
+    part = cell.part
+    for position, url in enumerate(urls):
+        if position:
+            paragraph._p.append(parse_xml(_LINE_BREAK.format(nsdecls('w'))))
+        paragraph._p.append(parse_xml(_HYPERLINK.format(nsdecls('w', 'r'), relationship_id(part, url), escape(url))))
+    logger.debug(f"Added {len(urls)} reference links")
@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import os
+import pickle
+from copy import deepcopy
+
+from docx import Document
+from docx.opc.packuri import PackURI
+from docx.opc.part import PartFactory, XmlPart
+from docx.oxml.shared import OxmlElement, qn
+from docx.package import Package
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_DIR = '.template_cache'
+
+# Bookmarks a client template can place, the findings are inserted after FINDINGS_BOOKMARK
+TITLE_BOOKMARK = 'title'
+DATE_BOOKMARK = 'date'
+FINDINGS_BOOKMARK = 'findings'
+
+# Styles the renderer applies by name, Word-authored templates often lack some of them
+RENDER_STYLES = ('Table Grid', 'Heading 1', 'Heading 2')
+
+_templates = {}  # (path, mtime, size) -> parsed master package
+
+
+def _template_key(template_path):
+    stat = os.stat(template_path)
+    return (os.path.abspath(template_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _snapshot(package):
+    """Serialized parts and relationships of a package, small enough to pickle."""
+    parts = list(package.iter_parts())
+    index = {part: position for position, part in enumerate(parts)}
+    reltypes = {}
+    for rel in package.iter_rels():
+        if not rel.is_external:
+            reltypes.setdefault(index[rel.target_part], rel.reltype)
+
+    def rels_of(source):
+        return [
+            (rel.reltype, rel.target_ref if rel.is_external else index[rel.target_part], rel.rId, rel.is_external)
+            for rel in source.rels.values()
+        ]
+
+    return {
+        'parts': [(str(part.partname), part.content_type, reltypes[index[part]], part.blob) for part in parts],
+        'part_rels': [rels_of(part) for part in parts],
+        'package_rels': rels_of(package),
+    }
+
+
+def _package_from_snapshot(snapshot):
+    """Rebuild a package from a snapshot, parsing every XML part once."""
+    package = Package()
+    parts = [
+        PartFactory(PackURI(partname), content_type, reltype, blob, package)
+        for partname, content_type, reltype, blob in snapshot['parts']
+    ]
+    for part, rels in zip(parts, snapshot['part_rels']):
+        for reltype, target, rId, is_external in rels:
+            part.load_rel(reltype, target if is_external else parts[target], rId, is_external)
+    for reltype, target, rId, is_external in snapshot['package_rels']:
+        package.load_rel(reltype, target if is_external else parts[target], rId, is_external)
+    package.after_unmarshal()
+    return package
+
+
+def _clone_package(master):
+    """Copy a parsed package part by part, XML trees are copied instead of parsed again."""
+    package = Package()
+    parts = {}
+    for part in master.iter_parts():
+        if isinstance(part, XmlPart):
+            parts[part] = type(part)(part.partname, part.content_type, deepcopy(part.element), package)
+        else:
+            # load() takes the package, the constructors don't agree on their fourth argument (ImagePart's is the image)
+            parts[part] = type(part).load(part.partname, part.content_type, part.blob, package)
+
+    for source, clone in [(master, package)] + list(parts.items()):
+        for rel in source.rels.values():
+            target = rel.target_ref if rel.is_external else parts[rel.target_part]
+            clone.load_rel(rel.reltype, target, rel.rId, rel.is_external)
+    package.after_unmarshal()
+    return package
+
+
+def _add_missing_styles(package):
+    """
+    Copy the RENDER_STYLES a template lacks, and the styles they are based on or linked
+    to, from python-docx's default template. Returns the names of the added styles.
+    """
+    styles = package.main_document_part.styles
+    missing = [name for name in RENDER_STYLES if name not in styles]
+    if not missing:
+        return []
+    default = Document().styles
+    default_styles = default.element
+    pending = [default[name].element for name in missing]
+    added = []
+    while pending:
+        style = pending.pop()
+        if style is None or styles.element.get_by_id(style.styleId) is not None:
+            continue
+        styles.element.append(deepcopy(style))
+        added.append(style.name_val)
+        link = style.find(qn('w:link'))
+        for style_id in (style.basedOn_val, link.get(qn('w:val')) if link is not None else None):
+            if style_id:
+                pending.append(default_styles.get_by_id(style_id))
+    return added
+
+
+def _log_added_styles(template_path, added):
+    if added:
+        logger.info(f"Template {template_path} lacks styles the report uses, added: {', '.join(added)}")
+
+
+def load_template(template_path, cache_dir=TEMPLATE_CACHE_DIR):
+    """
+    Return the parsed master package of a template.
+    It is parsed once per process, and a serialized snapshot is kept on disk so
+    later runs skip unzipping and walking the package.
+    """
+    key = _template_key(template_path)
+    if key in _templates:
+        return _templates[key]
+
+    cache_path = os.path.join(cache_dir, hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + '.pickle')
+    package = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                package = _package_from_snapshot(pickle.load(cache_file))
+            logger.info(f"Loaded template {template_path} from cache")
+            # Snapshots written before the styles were added lack them
+            _log_added_styles(template_path, _add_missing_styles(package))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable template cache {cache_path}: {str(e)}")
+            package = None
+
+    if package is None:
+        logger.info(f"Parsing template {template_path}")
+        package = Document(template_path).part.package
+        _log_added_styles(template_path, _add_missing_styles(package))
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, 'wb') as cache_file:
+                pickle.dump(_snapshot(package), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            logger.warning(f"Could not write template cache: {str(e)}")
+
+    _templates[key] = package
+    return package
+
+
+def new_report_document(template_path=None):
+    """A fresh document for one report, cloned from the cached template when one is given."""
+    if not template_path:
+        return Document()
+    return _clone_package(load_template(template_path)).main_document_part.document
+
+
+def template_static_key(template_path):
+    """Cache key for docx_writer's static parts, changes whenever the template file does."""
+    return "|".join(str(value) for value in _template_key(template_path))
+
+
+def find_bookmark(doc, name):
+    """Return the bookmarkStart element with this name, or None."""
+    for bookmark in doc.element.body.iter(qn('w:bookmarkStart')):
+        if bookmark.get(qn('w:name')) == name:
+            return bookmark
+    return None
+
+
+def fill_bookmark(doc, name, text):
+    """Replace the placeholder text inside a bookmark, keeping the formatting of its first run."""
+    start = find_bookmark(doc, name)
+    if start is None:
+        logger.debug(f"Template has no '{name}' bookmark")
+        return False
+
+    # Drop the runs between bookmarkStart and its bookmarkEnd in the same paragraph
+    bookmark_id = start.get(qn('w:id'))
+    rPr = None
+    sibling = start.getnext()
+    while sibling is not None:
+        if sibling.tag == qn('w:bookmarkEnd') and sibling.get(qn('w:id')) == bookmark_id:
+            break
+        following = sibling.getnext()
+        if sibling.tag == qn('w:r'):
+            if rPr is None and sibling.find(qn('w:rPr')) is not None:
+                rPr = deepcopy(sibling.find(qn('w:rPr')))
+            start.getparent().remove(sibling)
+        sibling = following
+
+    run = OxmlElement('w:r')
+    if rPr is not None:
+        run.append(rPr)
+    text_element = OxmlElement('w:t')
+    text_element.set(qn('xml:space'), 'preserve')
+    text_element.text = text
+    run.append(text_element)
+    start.addnext(run)
+    return True
+
+
+def bookmark_anchor(doc, name=FINDINGS_BOOKMARK):
+    """The top-level body element (paragraph or table) holding the bookmark, or None."""
+    anchor = find_bookmark(doc, name)
+    if anchor is None:
+        return None
+    body = doc.element.body
+    while anchor.getparent() is not body:
+        anchor = anchor.getparent()
+    return anchor
+
+
+def place_rendered_content(doc, first_index, name=FINDINGS_BOOKMARK):
+    """Move the body elements rendered from first_index on to just after the bookmark's paragraph."""
+    anchor = bookmark_anchor(doc, name)
+    if anchor is None:
+        logger.info(f"Template has no '{name}' bookmark, findings stay at the end")
+        return False
+
+    body = doc.element.body
+    rendered = [element for element in body[first_index:] if element.tag != qn('w:sectPr')]
+    for element in rendered:
+        anchor.addnext(element)
+        anchor = element
+    logger.info(f"Moved {len(rendered)} rendered elements to the '{name}' bookmark")
+    return True
@@ -0,0 +1,137 @@
+import csv
+import logging
+import os
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_COLUMNS = 2        # Columns of the nested resource table
+RESOURCE_CAP = 200          # Resources shown in the finding, the rest go to the appendix
+RESOURCE_TABLE_WIDTH = 6000  # Width of the merged 'Affected Resource' cell in twips (300pt)
+RESOURCE_FONT_SIZE = 20     # Half-points (10pt)
+RESOURCE_OVERFLOW_TARGET = "appendix"  # Where the full lists go: "appendix" or "csv" (see resource_csv_path)
+
+_PARAGRAPH_PROPERTIES = '<w:pPr><w:spacing w:before="0" w:after="0"/></w:pPr>'
+_BORDERS = ''.join(
+    f'<w:{side} w:val="nil"/>' for side in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV')
+)
+
+
+_HYPERLINK = (
+    '<w:hyperlink {} w:anchor="{}" w:history="1"><w:r><w:rPr><w:i/><w:color w:val="0563C1"/>'
+    '<w:u w:val="single"/></w:rPr><w:t>Appendix A</w:t></w:r></w:hyperlink>'
+)
+
+
+def resource_csv_path(report_path):
+    """Where the overflow CSV of a report goes, next to it: reports/acme.docx -> reports/acme_resources.csv."""
+    return os.path.splitext(report_path)[0] + '_resources.csv'
+
+
+def appendix_bookmark(index):
+    """Bookmark name of a finding's entry in the resource appendix."""
+    return f"resources_{index}"
+
+
+def add_overflow_reference(paragraph, text, bookmark, csv_name=None):
+    """Append text pointing to the full list: a link to the appendix or the CSV file name."""
+    if csv_name:
+        paragraph.add_run(f"{text} {csv_name}").italic = True
+        return
+    paragraph.add_run(f"{text} ").italic = True
+    paragraph._p.append(parse_xml(_HYPERLINK.format(nsdecls('w'), bookmark)))
+
+
+def _cell_xml(text, width):
+    run = ''
+    if text:
+        run = f'<w:r><w:rPr><w:sz w:val="{RESOURCE_FONT_SIZE}"/></w:rPr><w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+    return (
+        f'<w:tc><w:tcPr><w:tcW w:w="{width}" w:type="dxa"/></w:tcPr>'
+        f'<w:p>{_PARAGRAPH_PROPERTIES}{run}</w:p></w:tc>'
+    )
+
+
+def build_resource_table_xml(resources, columns=RESOURCE_COLUMNS, width=RESOURCE_TABLE_WIDTH):
+    """Build the XML of a borderless table listing resources top-to-bottom, column by column."""
+    columns = max(1, columns)
+    rows = (len(resources) + columns - 1) // columns
+    column_width = width // columns
+
+    parts = [
+        f'<w:tbl {nsdecls("w")}>',
+        f'<w:tblPr><w:tblW w:w="{width}" w:type="dxa"/><w:tblBorders>{_BORDERS}</w:tblBorders>',
+        '<w:tblLayout w:type="fixed"/><w:tblCellMar><w:left w:w="0" w:type="dxa"/></w:tblCellMar></w:tblPr>',
+        '<w:tblGrid>',
+        f'<w:gridCol w:w="{column_width}"/>' * columns,
+        '</w:tblGrid>',
+    ]
+    for row in range(rows):
+        parts.append('<w:tr>')
+        for col in range(columns):
+            index = col * rows + row
+            parts.append(_cell_xml(resources[index] if index < len(resources) else '', column_width))
+        parts.append('</w:tr>')
+    parts.append('</w:tbl>')
+    return ''.join(parts)
+
+
+def render_resource_table(cell, resources, columns=RESOURCE_COLUMNS, cap=RESOURCE_CAP, bookmark=None, csv_name=None):
+    """
+    Render resources into a nested table inside the cell with a single XML parse.
+    Resources beyond the cap are not rendered and are returned so the caller can
+    list them in an appendix.
+    """
+    logger.info(f"Rendering {len(resources)} resources as a {columns}-column table")
+    shown = resources if cap is None else resources[:cap]
+    overflow = [] if cap is None else resources[cap:]
+
+    table = parse_xml(build_resource_table_xml(shown, columns))
+
+    # A cell must end with a paragraph, so the table goes in front of the first one
+    cell.paragraphs[0]._p.addprevious(table)
+
+    if overflow:
+        add_overflow_reference(cell.paragraphs[0], f"... and {len(overflow)} more, listed in", bookmark, csv_name)
+        logger.info(f"{len(overflow)} resources moved to the appendix")
+    return overflow
+
+
+def render_resource_summary(cell, total, bookmark=None, csv_name=None):
+    """Show only the resource count in the cell, the list itself is rendered later."""
+    logger.info(f"{total} resources exceed the summary threshold, deferring the list")
+    add_overflow_reference(cell.paragraphs[0], f"{total} affected resources, listed in", bookmark, csv_name)
+
+
+def add_resource_appendix(doc, overflowing_findings, columns=RESOURCE_COLUMNS):
+    """Add an appendix listing the resources that did not fit in their finding."""
+    if not overflowing_findings:
+        return
+    logger.info(f"Adding resource appendix for {len(overflowing_findings)} findings")
+    # Bookmark ids must stay unique next to the ones a template already has
+    first_id = 1 + max((int(b.get(qn('w:id'))) for b in doc.element.body.iter(qn('w:bookmarkStart'))), default=-1)
+    doc.add_page_break()
+    doc.add_heading('Appendix A - Affected Resources', level=1)
+    for bookmark_id, (heading, bookmark, resources) in enumerate(overflowing_findings, start=first_id):
+        heading_paragraph = doc.add_heading(heading, level=2)
+        # After the heading's pPr, which must stay the paragraph's first child
+        heading_paragraph._p.get_or_add_pPr().addnext(parse_xml(
+            f'<w:bookmarkStart {nsdecls("w")} w:id="{bookmark_id}" w:name="{bookmark}"/>'
+        ))
+        heading_paragraph._p.append(parse_xml(f'<w:bookmarkEnd {nsdecls("w")} w:id="{bookmark_id}"/>'))
+        # Keep the table in front of the final sectPr like doc.add_table does
+        paragraph = doc.add_paragraph()
+        paragraph._p.addprevious(parse_xml(build_resource_table_xml(resources, columns)))
+
+
+def write_resource_csv(csv_path, overflowing_findings):
+    """Write the full resource lists to a CSV file next to the report."""
+    logger.info(f"Writing resources of {len(overflowing_findings)} findings to {csv_path}")
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['Finding', 'Affected Resource'])
+        for heading, _, resources in overflowing_findings:
+            writer.writerows((heading, resource) for resource in resources)
@@ -0,0 +1,116 @@
+import ipaddress
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Host kinds, in the order they are listed in the report
+KIND_IPV4 = 0
+KIND_IPV6 = 1
+KIND_HOSTNAME = 2
+
+# Parsed resources kept between calls, about 85 MiB per million, so long-lived processes stay bounded
+RESOURCE_CACHE_SIZE = 1 << 18
+
+# Above this many resources a finding only shows a count and a link, in the Word and the HTML report
+RESOURCE_SUMMARY_THRESHOLD = 1000
+
+
+@lru_cache(maxsize=RESOURCE_CACHE_SIZE)
+def parse_resource(resource):
+    """Parse a 'host:port' string once into (kind, host, ip, port) for numeric sorting."""
+    resource = resource.strip()
+    host, sep, port = resource.rpartition(':')
+    if not sep or not port.isdigit():
+        # No usable port, treat the whole string as the host
+        host, port = resource, ''
+    port_number = int(port) if port else 0
+
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return (KIND_HOSTNAME, host.lower(), 0, port_number, host, port)
+
+    kind = KIND_IPV4 if address.version == 4 else KIND_IPV6
+    return (kind, '', int(address), port_number, host, port)
+
+
+def resource_sort_key(resource):
+    """Packed integer key (host << 16 | port) so 10.0.0.2 sorts before 10.0.0.10."""
+    kind, name, ip, port_number, _, _ = parse_resource(resource)
+    return (kind, name, (ip << 16) | port_number)
+
+
+def sort_resources(resources):
+    """Return the unique resources sorted by IP address and port instead of lexically."""
+    return sorted({res.strip() for res in resources if res.strip()}, key=resource_sort_key)
+
+
+def _collapse_ports(ports):
+    """Collapse a set of port numbers into '80-82,443' style ranges."""
+    ranges = []
+    for port in sorted(ports):
+        if ranges and port == ranges[-1][1] + 1:
+            ranges[-1][1] = port
+        else:
+            ranges.append([port, port])
+    return ",".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+
+
+def _collapse_ipv4(addresses):
+    """Collapse sorted IPv4 integers into '10.1.1.1-40' runs that stay within one /24."""
+    runs = []
+    for ip in addresses:
+        if runs and ip == runs[-1][1] + 1 and ip >> 8 == runs[-1][0] >> 8:
+            runs[-1][1] = ip
+        else:
+            runs.append([ip, ip])
+
+    collapsed = []
+    for start, end in runs:
+        first = str(ipaddress.IPv4Address(start))
+        if start == end:
+            collapsed.append((start, first))
+        else:
+            collapsed.append((start, f"{first}-{end & 0xFF}"))
+    return collapsed
+
+
+def compact_resources(resources):
+    """
+    Compact 'host:port' strings for display:
+    - ports of the same host are merged into ranges (10.1.1.1:80-82,443)
+    - contiguous IPv4 hosts sharing the same ports are merged (10.1.1.1-40:443)
+    The result is sorted numerically by host and port.
+    """
+    logger.debug(f"Compacting {len(resources)} affected resources")
+
+    # Group the ports of each host
+    hosts = {}
+    for resource in resources:
+        if not resource.strip():
+            continue
+        kind, name, ip, port_number, host, port = parse_resource(resource)
+        entry = hosts.setdefault((kind, name, ip), (host, set()))
+        if port:
+            entry[1].add(port_number)
+
+    # Group hosts with an identical port specification
+    by_ports = {}
+    for (kind, name, ip), (host, ports) in hosts.items():
+        port_spec = _collapse_ports(ports)
+        by_ports.setdefault(port_spec, []).append((kind, name, ip, host))
+
+    compacted = []
+    for port_spec, members in by_ports.items():
+        suffix = f":{port_spec}" if port_spec else ""
+        ipv4 = sorted(ip for kind, _, ip, _ in members if kind == KIND_IPV4)
+        for ip, text in _collapse_ipv4(ipv4):
+            compacted.append(((KIND_IPV4, '', ip), port_spec, text + suffix))
+        for kind, name, ip, host in members:
+            if kind != KIND_IPV4:
+                compacted.append(((kind, name, ip), port_spec, host + suffix))
+
+    compacted.sort(key=lambda item: (item[0], item[1]))
+    logger.debug(f"Compacted resources into {len(compacted)} entries")
+    return [text for _, _, text in compacted]
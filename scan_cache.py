@@ -0,0 +1,164 @@
+import hashlib
+import importlib.util
+import logging
+import os
+import pickle
+from functools import lru_cache
+
+from exploitability import Exploitability
+from severity import Severity
+
+logger = logging.getLogger(__name__)
+
+SCAN_CACHE_DIR = '.scan_cache'
+
+# Bump when the cache file layout changes, older cache files are then ignored
+SCAN_CACHE_VERSION = 1
+
+# Modules that turn an export into grouped findings, editing any of them invalidates the cache
+INGEST_MODULES = (
+    'script5', 'csv_mmap', 'nessus_csv', 'scanner_formats', 'openvas_csv', 'qualys_csv', 'burp_xml',
+    'nessus_xml', 'summarize', 'references', 'exploitability', 'severity', 'resources',
+)
+
+# Bytes per read when hashing a scan where hashlib.file_digest is missing (Python < 3.11)
+DIGEST_CHUNK = 1024 * 1024
+
+# Finding keys stored as lists and restored to their ingest types
+_SETS = ('affected_resource',)
+_TUPLES = ('references',)
+_ENUMS = {'severity': Severity, 'exploitability': Exploitability}
+
+
+def scan_digest(scan_path):
+    """Content hash of the scan export."""
+    with open(scan_path, 'rb') as scan_file:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(scan_file, 'sha1').hexdigest()
+        digest = hashlib.sha1()
+        for chunk in iter(lambda: scan_file.read(DIGEST_CHUNK), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def ingest_digest():
+    """Hash of the ingest module sources, so a parser change never serves findings of the old one."""
+    digest = hashlib.sha1()
+    for name in INGEST_MODULES:
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.origin is None:
+            continue
+        with open(spec.origin, 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def scan_cache_key(scan_path):
+    """Cache key from the file's content hash and mtime, the ingest sources and the cache format version."""
+    mtime = os.stat(scan_path).st_mtime_ns
+    key = f"{scan_digest(scan_path)}|{mtime}|{ingest_digest()}|{SCAN_CACHE_VERSION}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _arrow():
+    """pyarrow when it is installed, the cache falls back to pickle without it."""
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _to_columns(grouped_vulnerabilities):
+    findings = list(grouped_vulnerabilities.values())
+    keys = list(findings[0]) if findings else []
+    columns = {}
+    for key in keys:
+        values = [finding.get(key) for finding in findings]
+        if key in _SETS or key in _TUPLES:
+            values = [list(value) for value in values]
+        elif key in _ENUMS:
+            values = [int(value) for value in values]
+        columns[key] = values
+    return columns
+
+
+def _from_columns(columns):
+    keys = list(columns)
+    grouped_vulnerabilities = {}
+    for values in zip(*(columns[key] for key in keys)):
+        finding = dict(zip(keys, values))
+        for key in _SETS:
+            if key in finding:
+                finding[key] = set(finding[key])
+        for key in _TUPLES:
+            if key in finding:
+                finding[key] = tuple(finding[key])
+        for key, enum in _ENUMS.items():
+            if key in finding:
+                finding[key] = enum(finding[key])
+        grouped_vulnerabilities[finding['name']] = finding
+    return grouped_vulnerabilities
+
+
+def _store(path, columns):
+    pa = _arrow()
+    if pa is None:
+        with open(path, 'wb') as cache_file:
+            pickle.dump(columns, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        return
+    # Uncompressed Arrow IPC, so a later run can memory map it instead of reading it
+    table = pa.table(columns)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _load(path):
+    pa = _arrow()
+    if pa is None:
+        with open(path, 'rb') as cache_file:
+            return pickle.load(cache_file)
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pydict()
+
+
+def _cache_path(key, cache_dir):
+    return os.path.join(cache_dir, key + ('.arrow' if _arrow() is not None else '.pickle'))
+
+
+def load_cached_findings(scan_path, cache_dir=SCAN_CACHE_DIR, key=None):
+    """Grouped findings cached for this exact scan file, or None."""
+    path = _cache_path(key or scan_cache_key(scan_path), cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        grouped_vulnerabilities = _from_columns(_load(path))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable scan cache {path}: {str(e)}")
+        return None
+    logger.info(f"Loaded {len(grouped_vulnerabilities)} findings of {scan_path} from cache")
+    return grouped_vulnerabilities
+
+
+def store_cached_findings(scan_path, grouped_vulnerabilities, cache_dir=SCAN_CACHE_DIR, key=None):
+    """Cache the grouped findings of a scan file, failures only cost the next run a parse."""
+    path = _cache_path(key or scan_cache_key(scan_path), cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _store(path, _to_columns(grouped_vulnerabilities))
+    except Exception as e:
+        logger.warning(f"Could not write scan cache: {str(e)}")
+        return False
+    logger.info(f"Cached {len(grouped_vulnerabilities)} findings of {scan_path}")
+    return True
+
+
+def cached_grouped_vulnerabilities(scan_path, load, cache_dir=SCAN_CACHE_DIR):
+    """Return load(scan_path) from the cache when the scan is unchanged, parsing and caching it otherwise."""
+    key = scan_cache_key(scan_path)
+    grouped_vulnerabilities = load_cached_findings(scan_path, cache_dir, key)
+    if grouped_vulnerabilities is None:
+        grouped_vulnerabilities = load(scan_path)
+        store_cached_findings(scan_path, grouped_vulnerabilities, cache_dir, key)
+    return grouped_vulnerabilities
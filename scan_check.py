@@ -0,0 +1,176 @@
+import logging
+import mmap
+import os
+import time
+from collections import Counter, namedtuple
+
+from csv_mmap import compile_projection, iter_raw_records, read_header, split_record, unquote_field
+from nessus_csv import REQUIRED_FIELDS
+from scanner_formats import detect_format, load_adapter
+from severity import Severity
+
+logger = logging.getLogger(__name__)
+
+# Malformed rows and encoding errors listed in the report, the rest are only counted
+CHECK_EXAMPLES = 20
+
+# Columns whose distinct values the check reports
+_STAT_FIELDS = ('plugin_id', 'host', 'risk_factor')
+
+ScanCheck = namedtuple('ScanCheck', [
+    'path', 'scanner', 'columns', 'rows', 'missing_columns',
+    'malformed_count', 'malformed_rows',  # (row, line, field count)
+    'encoding_error_count', 'encoding_errors',  # (row, line, byte offset, reason)
+    'plugins', 'hosts', 'row_severities', 'plugin_severities', 'seconds',
+])
+
+
+def _severity_counts(counts):
+    severities = Counter()
+    for risk_factor, count in counts.items():
+        if isinstance(risk_factor, bytes):
+            risk_factor = risk_factor.decode('utf-8', 'replace')
+        severities[Severity.from_risk(risk_factor)] += count
+    return severities
+
+
+def check_csv(csv_path, required_fields=REQUIRED_FIELDS, examples=CHECK_EXAMPLES):
+    """
+    Stream a Nessus CSV export once without decoding it: every record must have as many
+    fields as the header and be valid UTF-8. Well-formed records are matched by one regex
+    that also captures the plugin, host and risk columns, only the others are split in Python.
+    """
+    start_time = time.perf_counter()
+    encoding_errors = []
+    encoding_error_count = 0
+    try:
+        header, data_start = read_header(csv_path)
+    except UnicodeDecodeError as e:
+        header, data_start = read_header(csv_path, errors='replace')
+        encoding_errors.append((0, 1, e.start, e.reason))
+        encoding_error_count += 1
+    column_map = {column_name: i for i, column_name in enumerate(header)}
+    missing_columns = [column_name for column_name in required_fields.values() if column_name not in column_map]
+    stat_columns = [column_map.get(required_fields[field]) for field in _STAT_FIELDS]
+    if None in stat_columns:
+        stat_columns = None
+
+    malformed_rows = []
+    malformed_count = 0
+    plugin_risks = {}
+    hosts = set()
+    row_risks = Counter()
+    rows = 0
+    with open(csv_path, 'rb') as csv_file:
+        size = os.fstat(csv_file.fileno()).st_size
+        buffer = mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            match, order = compile_projection(tuple(stat_columns or [0]), len(header) or 1)
+            match = match.match
+            line = buffer[:data_start].count(b'\n') + 1
+            position = data_start
+            while position < size:
+                record = match(buffer, position)
+                if record is not None:
+                    start, next_position = position, record.end()
+                    groups = record.groups()
+                    values = [unquote_field(groups[index]) for index in order]
+                else:
+                    for start, next_position, raw in iter_raw_records(buffer, position):
+                        break
+                    else:
+                        break  # Only blank lines left
+                    line += buffer[position:start].count(b'\n')
+                    fields = split_record(raw)
+                    values = None
+                    if len(fields) != len(header):
+                        malformed_count += 1
+                        if len(malformed_rows) < examples:
+                            malformed_rows.append((rows + 1, line, len(fields)))
+                    elif stat_columns:
+                        values = [fields[index] for index in stat_columns]
+
+                rows += 1
+                raw = buffer[start:next_position]
+                if not raw.isascii():
+                    try:
+                        raw.decode('utf-8')
+                    except UnicodeDecodeError as e:
+                        encoding_error_count += 1
+                        if len(encoding_errors) < examples:
+                            encoding_errors.append((rows, line, start + e.start, e.reason))
+                if values is not None and stat_columns:
+                    plugin_id, host, risk_factor = values
+                    plugin_risks.setdefault(plugin_id, risk_factor)
+                    hosts.add(host)
+                    row_risks[risk_factor] += 1
+
+                line += raw.count(b'\n')
+                position = next_position
+        finally:
+            if size:
+                buffer.close()
+
+    return ScanCheck(
+        csv_path, 'nessus_csv', len(header), rows, missing_columns,
+        malformed_count, malformed_rows, encoding_error_count, encoding_errors,
+        len(plugin_risks), len(hosts), _severity_counts(row_risks), _severity_counts(Counter(plugin_risks.values())),
+        time.perf_counter() - start_time,
+    )
+
+
+def check_rows(scan_path, scanner_format):
+    """Row count, plugins, hosts and severities of an export read through its adapter."""
+    start_time = time.perf_counter()
+    plugin_risks = {}
+    hosts = set()
+    row_risks = Counter()
+    rows = 0
+    for rows, row in enumerate(load_adapter(scanner_format).iter_rows(scan_path), 1):
+        plugin_risks.setdefault(row['plugin_id'], row['risk_factor'])
+        hosts.add(row['host'])
+        row_risks[row['risk_factor']] += 1
+    return ScanCheck(
+        scan_path, scanner_format.name, None, rows, [], 0, [], 0, [],
+        len(plugin_risks), len(hosts), _severity_counts(row_risks), _severity_counts(Counter(plugin_risks.values())),
+        time.perf_counter() - start_time,
+    )
+
+
+def check_scan(scan_path):
+    """
+    Validate a scan export without building any document. Nessus CSV exports get the
+    column and encoding checks, other formats are only counted through their adapter.
+    """
+    scanner_format = detect_format(scan_path)
+    if scanner_format.name == 'nessus_csv':
+        return check_csv(scan_path)
+    return check_rows(scan_path, scanner_format)
+
+
+def check_passed(check):
+    """True when rendering would read every row of the export as it is."""
+    return not (check.missing_columns or check.malformed_count or check.encoding_error_count)
+
+
+def format_check(check):
+    """The check as report lines."""
+    columns = f"{check.columns} columns, " if check.columns is not None else ""
+    lines = [f"{check.path} ({check.scanner}): {columns}{check.rows} rows in {check.seconds:.2f} s"]
+    if check.missing_columns:
+        lines.append(f"Missing required columns: {', '.join(check.missing_columns)}")
+    if check.malformed_count:
+        lines.append(f"Malformed rows: {check.malformed_count}")
+        lines.extend(f"  row {row} (line {line}): {fields} fields, expected {check.columns}"
+                     for row, line, fields in check.malformed_rows)
+    if check.encoding_error_count:
+        lines.append(f"Encoding errors: {check.encoding_error_count} (these bytes are dropped when rendering)")
+        lines.extend(f"  row {row} (line {line}), byte {offset}: {reason}"
+                     for row, line, offset, reason in check.encoding_errors)
+    lines.append(f"Unique plugins: {check.plugins}, unique hosts: {check.hosts}")
+    lines.append(f"{'Severity':<15}{'Rows':>10}{'Plugins':>10}")
+    for severity in sorted(Severity, reverse=True):
+        if check.row_severities[severity]:
+            lines.append(f"{severity.label:<15}{check.row_severities[severity]:>10}{check.plugin_severities[severity]:>10}")
+    lines.append("OK" if check_passed(check) else "FAILED")
+    return lines
@@ -0,0 +1,80 @@
+import importlib
+import logging
+from collections import namedtuple
+
+from nessus_csv import projected_columns
+
+logger = logging.getLogger(__name__)
+
+# Fields every adapter yields per row. The optional ones feed the exploitability
+# classifier and the Tool used cell, rows without 'tool' come from Nessus.
+# Other scanners prefix their plugin_id ('qualys:38173'), so their IDs never share the
+# summary and reference memos, the knowledge base or the findings store with Nessus IDs.
+FINDING_FIELDS = (
+    'plugin_id', 'name', 'description', 'cvs_score', 'risk_factor', 'host', 'port', 'mitigation', 'references',
+)
+OPTIONAL_FINDING_FIELDS = ('protocol', 'metasploit', 'core_impact', 'canvas', 'tool')
+
+# Bytes read from the start of a file to detect its format
+HEADER_BYTES = 64 * 1024
+
+# A format is detected when all its markers are in the header bytes, its adapter
+# module has iter_rows(path) yielding dicts of the finding fields
+ScannerFormat = namedtuple('ScannerFormat', ['name', 'module', 'markers'])
+
+# Checked in order, the XML roots first since any CSV could quote them in a description
+SCANNER_FORMATS = (
+    ScannerFormat('nessus_xml', 'nessus_xml', (b'<NessusClientData_v2',)),
+    ScannerFormat('burp_xml', 'burp_xml', (b'<issues', b'burpVersion')),
+    ScannerFormat('nessus_csv', 'nessus_csv', (b'Plugin ID', b'Risk Factor')),
+    ScannerFormat('openvas_csv', 'openvas_csv', (b'NVT Name', b'NVT OID')),
+    ScannerFormat('qualys_csv', 'qualys_csv', (b'"QID"', b'"Title"', b'"Severity"')),
+)
+
+
+def read_header_bytes(path, size=HEADER_BYTES):
+    with open(path, 'rb') as scan_file:
+        return scan_file.read(size)
+
+
+def detect_format(path):
+    """The ScannerFormat of a scan export, from its first HEADER_BYTES bytes only."""
+    header = read_header_bytes(path)
+    for scanner_format in SCANNER_FORMATS:
+        if all(marker in header for marker in scanner_format.markers):
+            logger.info(f"Detected {scanner_format.name} export: {path}")
+            return scanner_format
+    raise ValueError(f"Unrecognized scan export format: {path}")
+
+
+def load_adapter(scanner_format):
+    """The adapter module of a format, imported the first time that format is detected."""
+    return importlib.import_module(scanner_format.module)
+
+
+def iter_scan_rows(path, reader=None):
+    """
+    Finding rows of a scan export in any registered format. reader ("mmap" or "text")
+    picks how a Nessus CSV export is read, the other adapters have one way only.
+    """
+    scanner_format = detect_format(path)
+    adapter = load_adapter(scanner_format)
+    if reader is not None and scanner_format.name == "nessus_csv":
+        return adapter.iter_rows(path, reader)
+    return adapter.iter_rows(path)
+
+
+def iter_mapped_rows(csv_reader, header, required_fields, optional_fields, defaults):
+    """
+    Finding rows of a CSV export whose columns are mapped by required_fields and
+    optional_fields (field -> column name). defaults fills the fields the export lacks.
+    """
+    fields, columns = projected_columns(header, required_fields, optional_fields)
+    last_column = max(columns)
+    for row_count, values in enumerate(csv_reader, 1):
+        if len(values) <= last_column:
+            logger.warning(f"Skipping row {row_count} due to missing or invalid data")
+            continue
+        row = dict(defaults)
+        row.update({field: values[i] for field, i in zip(fields, columns)})
+        yield row
@@ -4,6 +4,7 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH   # used to align the paragraph
 from docx.enum.section import WD_SECTION   # used to create a new page or section in the document 
 from docx.oxml.shared import OxmlElement, qn  # used to handle the XML element such as cell colour
 import csv  # use to read and parse the CSV 
+from severity import Severity, apply_severity_style  # used to color the risk rating cell
 
 
 def make_cell_text_bold(cell):
@@ -291,32 +292,7 @@ def append_data(doc, csv_row_no, data_to_append, predefined_keywords):
     doc.tables[csv_row_no*8+1].rows[1].cells[0].text = data_to_append['cvs_score']
     # risk_rating
     cell = doc.tables[csv_row_no*8+1].rows[1].cells[1]
-    cell.text = data_to_append['risk_factor']
-    if data_to_append['risk_factor'].lower() == 'critical':
-        tcPr = cell._tc.get_or_add_tcPr()
-        tcShading = OxmlElement('w:shd')
-        tcShading.set(qn('w:fill'), '800000')
-        tcPr.append(tcShading)
-    elif data_to_append['risk_factor'].lower() == 'high':
-        tcPr = cell._tc.get_or_add_tcPr()
-        tcShading = OxmlElement('w:shd')
-        tcShading.set(qn('w:fill'), 'FF6600')
-        tcPr.append(tcShading)
-    elif data_to_append['risk_factor'].lower() == 'medium':
-        tcPr = cell._tc.get_or_add_tcPr()
-        tcShading = OxmlElement('w:shd')
-        tcShading.set(qn('w:fill'), 'FFFF00')
-        tcPr.append(tcShading)
-    elif data_to_append['risk_factor'].lower() == 'low':
-        tcPr = cell._tc.get_or_add_tcPr()
-        tcShading = OxmlElement('w:shd')
-        tcShading.set(qn('w:fill'), '008000')
-        tcPr.append(tcShading)
-    elif data_to_append['risk_factor'].lower() == 'informational':
-        tcPr = cell._tc.get_or_add_tcPr()
-        tcShading = OxmlElement('w:shd')
-        tcShading.set(qn('w:fill'), '3366FF')
-        tcPr.append(tcShading)
+    apply_severity_style(cell, data_to_append['severity'])
 
     # remote_exploitability
     doc.tables[csv_row_no*8+1].rows[1].cells[2].text = "Yes"
@@ -390,6 +366,7 @@ def main():
                 "cvs_score": csv_row_data[2],
                 "risk_rating": "",
                 "risk_factor": csv_row_data[18],
+                "severity": Severity.from_risk(csv_row_data[18]),
                 "remote_exploitability": "Yes",
                 "affected_resource": [],
                 "module_name": "",  # Placeholder, this will be set dynamically
@@ -7,21 +7,14 @@ from docx.enum.table import WD_ALIGN_VERTICAL
 from docx.oxml import parse_xml
 from docx.oxml.ns import nsdecls
 import csv  # use to read and parse the CSV 
+from theme import apply_document_theme  # used to set the document font through its styles
+from summarize import summarize_description  # used to take the first sentence of the description
 
 def set_document_font(doc, font_name="Helvetica", font_size=11):
     """Set the default font for the entire document."""
-    style = doc.styles['Normal']
-    style.font.name = font_name
-    style.font.size = Pt(font_size)  # Set default size (optional)
-    
-    # Ensure the correct font is applied to tables too
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = font_name
-                        run.font.size = Pt(font_size)
+    # The Normal and table styles carry the font, runs inherit it
+    apply_document_theme(doc, font_name, font_size)
+
 def make_cell_text_bold(cell):
     """Helper function to make cell text bold"""
     paragraph = cell.paragraphs[0]
@@ -489,7 +482,7 @@ def main():
                 grouped_vulnerabilities[vulnerability_name] = {
                     "name": vulnerability_name,
                     "finding_id": f"ABCXYZ-{finding_id_counter}",
-                    "description": csv_row_data[9].split('.')[0],
+                    "description": summarize_description(csv_row_data[9], csv_row_data[0]),
                     "cvs_score": csv_row_data[2],
                     "risk_factor": csv_row_data[18],
                     "remote_exploitability": "Yes",
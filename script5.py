@@ -1,4 +1,3 @@
-from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.section import WD_SECTION
@@ -11,6 +10,33 @@ import logging
 import os
 import sys    #used to print the log to console
 from datetime import datetime
+from resources import RESOURCE_SUMMARY_THRESHOLD, compact_resources, sort_resources
+from functools import partial
+from itertools import chain
+from severity import Severity, apply_severity_style
+from theme import apply_document_theme
+from docx_writer import save_document
+from knowledge_base import join_knowledge_base
+from summarize import summarize_description
+from references import add_reference_links, parse_references
+from csv_mmap import iter_projected_rows, read_header, split_ranges
+from nessus_csv import projected_columns
+from scanner_formats import detect_format, iter_scan_rows
+from exploitability import classify_row
+from scan_cache import cached_grouped_vulnerabilities, scan_digest
+from findings_store import connect_store, import_scan, iter_store_rows
+from delta import delta_rows, diff_scans, index_scan
+from tracker import tracker_path, write_tracker
+from html_report import HTML_PATH, write_html_report
+from concurrent.futures import ProcessPoolExecutor
+from report_template import (
+    DATE_BOOKMARK, FINDINGS_BOOKMARK, TITLE_BOOKMARK,
+    fill_bookmark, new_report_document, place_rendered_content, template_static_key,
+)
+from resource_table import (
+    RESOURCE_CAP, RESOURCE_COLUMNS, RESOURCE_OVERFLOW_TARGET, add_resource_appendix, appendix_bookmark,
+    render_resource_summary, render_resource_table, resource_csv_path, write_resource_csv,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,21 +49,11 @@ logger = logging.getLogger(__name__)
   #Creates a logger object  ( logger will be used in the entire script now)
 
 def set_document_font(doc, font_name="Helvetica", font_size=11):
-    """Set the default font for the entire document."""
+    """Set the default font for the entire document through its styles."""
     logger.info(f"Setting document font to {font_name}, size {font_size}")   # This will log and message in the console
     try:
-        style = doc.styles['Normal']
-        style.font.name = font_name        # Used try catch for exception handling
-        style.font.size = Pt(font_size)
-        
-        # Ensure the correct font is applied to tables too
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.name = font_name
-                            run.font.size = Pt(font_size)
+        # Runs inherit the font from the Normal and table styles, no run is visited
+        apply_document_theme(doc, font_name, font_size)
         logger.info("Document font set successfully")    # If this execute this will print font set successfully
     except Exception as e:
         logger.error(f"Failed to set document font: {str(e)}")   
@@ -58,15 +74,24 @@ def make_cell_text_bold(cell):
         logger.error(f"Failed to make cell text bold: {str(e)}")
         raise
 
-def format_affected_resources(table, affected_resources):
+def format_affected_resources(table, affected_resources, columns=RESOURCE_COLUMNS, cap=RESOURCE_CAP,
+                              threshold=RESOURCE_SUMMARY_THRESHOLD, bookmark=None):
+    """Fill the affected resource cell and return the resources that exceeded the cap."""
     logger.info(f"Formatting affected resources table for {len(affected_resources)} resources")
     try:
         cell = table.cell(1, 0)
         cell.text = ""  # Clear existing content
-        
-        # Sort the resources for consistent display
-        resources = sorted(affected_resources)
+        csv_name = os.path.basename(resource_csv_path(OUTPUT_PATH)) if RESOURCE_OVERFLOW_TARGET == "csv" else None
+
+        # Sort numerically by IP/port and collapse contiguous hosts and ports
+        resources = compact_resources(affected_resources)
         total = len(resources)
+
+        # Oversized findings only get a count, the list goes to the appendix
+        if total > threshold:
+            render_resource_summary(cell, total, bookmark, csv_name)
+            return resources
+        overflow = []
         
         # Clear all existing paragraphs in the cell except the first one
         for p in cell.paragraphs[1:]:
@@ -93,52 +118,17 @@ def format_affected_resources(table, affected_resources):
                 paragraph.space_after = Pt(0)
                 paragraph.space_before = Pt(0)
         
-        # For 5 or more resources: two-column layout
+        # For 5 or more resources: nested table built in one XML pass
         else:
-            # Calculate number of rows needed (ceiling division)
-            rows = (total + 1) // 2  # This ensures we round up
-            
-            # Add first row to existing paragraph
-            if resources:
-                run = first_paragraph.add_run(resources[0])
-                run.font.size = Pt(10)
-                padding = 35 - len(resources[0])  # Adjust 35 based on your needs
-                run = first_paragraph.add_run(" " * padding)
-                
-                # Add right column for first row if it exists
-                if rows < len(resources):
-                    run = first_paragraph.add_run(resources[rows])
-                    run.font.size = Pt(10)
-            
-            # Set paragraph spacing
-            first_paragraph.space_after = Pt(0)
-            first_paragraph.space_before = Pt(0)
-            
-            # Create paragraph for each remaining row (starting from index 1)
-            for i in range(1, rows):
-                paragraph = cell.add_paragraph()
-                
-                # Add left column
-                if i < len(resources):
-                    run = paragraph.add_run(resources[i])
-                    run.font.size = Pt(10)  
-                    padding = 35 - len(resources[i])  # Adjust based on your needs
-                    run = paragraph.add_run(" " * padding)
-                    
-                    # Add right column if it exists
-                    if i + rows < len(resources):
-                        run = paragraph.add_run(resources[i + rows])
-                        run.font.size = Pt(10)
-                
-                # Set paragraph spacing
-                paragraph.space_after = Pt(0)
-                paragraph.space_before = Pt(0)
+            overflow = render_resource_table(cell, resources, columns=columns, cap=cap,
+                                             bookmark=bookmark, csv_name=csv_name)
         logger.info("Successfully formatted affected resources")
+        return overflow
     except Exception as e:
         logger.error(f"Failed to format affected resources: {str(e)}")
         raise
 
-def create_table(doc, heading):
+def create_table(doc, heading, page_break_before=False):
     logger.info(f"Creating table with heading: {heading}")
     try:
         paragraph = doc.add_paragraph()
@@ -146,6 +136,8 @@ def create_table(doc, heading):
         run.bold = True
         paragraph_format = paragraph.paragraph_format
         paragraph_format.space_after = Pt(0)
+        if page_break_before:
+            paragraph_format.page_break_before = True  # Start the finding on a new page without a section
         # Apply the theme color (matches Word's default heading color)
         rPr = run._element.get_or_add_rPr()
         color = parse_xml(r'<w:color {} w:val="365F91"/>'.format(nsdecls('w')))  # Blue theme color
@@ -399,6 +391,21 @@ def create_table(doc, heading):
         logger.error(f"Failed to create table for {heading}: {str(e)}")
         raise
 
+# How findings are separated: "heading" (pageBreakBefore on the finding heading),
+# "page_break" (w:br page break) or "section" (a new section per finding)
+PAGINATION_MODE = "heading"
+
+# Client-branded .docx with 'title', 'date' and 'findings' bookmarks, None for the built-in layout
+REPORT_TEMPLATE = None
+REPORT_TITLE = 'RNS DATA AUTOMATION'
+
+# Scan export the report is built from, and where the Word report is saved
+SCAN_PATH = 'dataset.csv'
+OUTPUT_PATH = 'output_document.docx'
+
+# Output deflate level: "fast" for drafts, "default", "max" for delivery or "store"
+OUTPUT_COMPRESSION = "default"
+
 KEYWORDS = {
     'Apache': 'Apache',
     'Window': 'Windows',
@@ -422,75 +429,66 @@ def get_module_name(name, predefined_keywords):
         logger.error(f"Error in get_module_name: {str(e)}")
         return ""
 
-def append_data(doc, csv_row_no, data_to_append, predefined_keywords):
+def append_data(doc, csv_row_no, data_to_append, predefined_keywords, table_offset=0):
     logger.info(f"Appending data for vulnerability {data_to_append['finding_id']}")
     try:
+        # The 8 tables of this finding, after any tables the template itself contains
+        first_table = table_offset + csv_row_no * 8
+        tables = doc.tables[first_table:first_table + 8]
+
         # table - 0
         # finding_id
-        finding_id_cell = doc.tables[csv_row_no * 8].rows[1].cells[0]
+        finding_id_cell = tables[0].rows[1].cells[0]
         finding_id_cell.text = data_to_append['finding_id']
         finding_id_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
         
         # Prepend the required text to the description
         description = f"During Vulnerability assessment and Penetration testing we observed that, {data_to_append['description']}"
-        doc.tables[csv_row_no * 8].rows[1].cells[1].text = description
+        tables[0].rows[1].cells[1].text = description
 
         # table - 1
         # cvs_score
-        doc.tables[csv_row_no * 8 + 1].rows[1].cells[0].text = data_to_append['cvs_score']
-
-        # risk_rating (with color highlighting)
-        cell = doc.tables[csv_row_no * 8 + 1].rows[1].cells[1]
-        cell.text = data_to_append['risk_factor'].capitalize()
-
-        risk_colors = {
-            "critical": "800000",
-            "high": "FFC404",
-            "medium": "FFFF00",
-            "low": "008000",
-            "informational": "3366FF",
-        }
-        
-        risk_color = risk_colors.get(data_to_append['risk_factor'].lower())
-        if risk_color:
-            tcPr = cell._tc.get_or_add_tcPr()
-            tcShading = OxmlElement('w:shd')
-            tcShading.set(qn('w:fill'), risk_color)
-            tcPr.append(tcShading)
+        tables[1].rows[1].cells[0].text = data_to_append['cvs_score']
+
+        # risk_rating (with the prebuilt color of its severity tier)
+        cell = tables[1].rows[1].cells[1]
+        apply_severity_style(cell, data_to_append['severity'])
 
-        # remote_exploitability
-        doc.tables[csv_row_no * 8 + 1].rows[1].cells[2].text = "Yes"
+        # remote_exploitability, classified at ingest
+        tables[1].rows[1].cells[2].text = data_to_append.get('remote_exploitability', "Yes")
 
         # table - 2 (Affected Resource & Module Name)
-        table = doc.tables[csv_row_no * 8 + 2]
+        table = tables[2]
         
         # Get affected resources as a list
         affected_resources = data_to_append["affected_resource"].split("\n")
         
-        # Use new formatting function
-        format_affected_resources(table, affected_resources)
+        # Resources above the cap are kept on the record for the appendix
+        data_to_append["overflow_resources"] = format_affected_resources(
+            table, affected_resources, bookmark=appendix_bookmark(csv_row_no)
+        )
 
         # Module Name - dynamically matched from predefined keywords
         module_name_cell = table.cell(1, 2)
         module_name_cell.text = get_module_name(data_to_append['name'], predefined_keywords)
         module_name_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
 
-        # table - 3 (Security Risk)
-        doc.tables[csv_row_no * 8 + 3].rows[1].cells[0].text = ""
+        # table - 3 (Security Risk), curated text from the knowledge base
+        tables[3].rows[1].cells[0].text = data_to_append.get('security_risk', "")
 
         # table - 4 (Business Impact)
-        doc.tables[csv_row_no * 8 + 4].rows[0].cells[1].text = ""
+        tables[4].rows[0].cells[1].text = data_to_append.get('business_impact', "")
 
-        # table - 5 (Workaround / Mitigation)
-        solution = f"It is recommended: \n-To {data_to_append['mitigation']}"
-        doc.tables[csv_row_no * 8 + 5].rows[1].cells[0].text = solution
+        # table - 5 (Workaround / Mitigation), curated text wins over the scanner's solution
+        solution = data_to_append.get('curated_mitigation') or f"It is recommended: \n-To {data_to_append['mitigation']}"
+        tables[5].rows[1].cells[0].text = solution
 
         # table - 6 (Tool Used & References)
-        doc.tables[csv_row_no * 8 + 6].rows[1].cells[0].text = "Nessus"
-        doc.tables[csv_row_no * 8 + 6].rows[1].cells[2].text = data_to_append['references']
+        tables[6].rows[1].cells[0].text = data_to_append.get('tool', "Nessus")
+        add_reference_links(tables[6].rows[1].cells[2], data_to_append['references'])
 
         # table - 7 (Proof of Concept)
-        proof_of_concept_cell = doc.tables[csv_row_no * 8 + 7].rows[1].cells[0]
+        proof_of_concept_cell = tables[7].rows[1].cells[0]
         existing_text = proof_of_concept_cell.text  # Preserve existing content
         proof_of_concept_cell.text = ""  # Clear the cell to format text properly
 
@@ -506,39 +504,301 @@ def append_data(doc, csv_row_no, data_to_append, predefined_keywords):
         logger.error(f"Failed to append data for {data_to_append['finding_id']}: {str(e)}")
         raise
 
-def validate_csv_columns(column_map, required_fields):
-    """Validate if all required columns exist in the CSV file"""
-    logger.info("Validating CSV columns")
-    missing_fields = []
-    for field, column_name in required_fields.items():
-        if column_name not in column_map:
-            missing_fields.append(column_name)
-    
-    if missing_fields:
-        error_msg = f"Missing required columns in CSV: {', '.join(missing_fields)}"
-        logger.error(error_msg)
-        return False, error_msg
-    
-    logger.info("All required columns found in CSV")
-    return True, ""
+def add_finding_break(doc, mode=PAGINATION_MODE):
+    """Start the next finding on a new page, sections are only added in 'section' mode."""
+    if mode == "section":
+        doc.add_section(WD_SECTION.NEW_PAGE)
+    elif mode == "page_break":
+        doc.add_page_break()
+    # In "heading" mode the next finding heading carries pageBreakBefore instead
 
-def main():
-    logger.info("Starting document creation process")
-    
+
+def render_findings(doc, grouped_vulnerabilities, pagination=PAGINATION_MODE):
+    """Render every grouped finding, then the resources that did not fit in their finding."""
+    logger.info(f"Rendering {len(grouped_vulnerabilities)} findings with '{pagination}' pagination")
+    table_offset = len(doc.tables)  # Tables that come with the template
+
+    # Resources that did not fit in their finding, listed in the appendix
+    overflowing_findings = []
+
+    # Create tables for each vulnerability
+    for index, (vulnerability_name, data_to_append) in enumerate(grouped_vulnerabilities.items()):
+        logger.info(f"Creating table for vulnerability {index + 1}: {vulnerability_name}")
+
+        # Strip spaces and sort by IP/port before joining affected resources
+        data_to_append["affected_resource"] = "\n".join(sort_resources(data_to_append["affected_resource"]))
+
+        # Create the table
+        numbered_finding_name = f"{index + 1}. {vulnerability_name}"
+        create_table(doc, numbered_finding_name, page_break_before=(pagination == "heading" and index > 0))
+
+        # Add new page except for the last vulnerability
+        if index < len(grouped_vulnerabilities) - 1:
+            add_finding_break(doc, pagination)
+            logger.info("Added new page for next vulnerability")
+
+        join_knowledge_base(data_to_append)
+        append_data(doc, index, data_to_append, KEYWORDS, table_offset)
+        if data_to_append["overflow_resources"]:
+            overflowing_findings.append(
+                (numbered_finding_name, appendix_bookmark(index), data_to_append["overflow_resources"])
+            )
+
+    # Full resource lists are only built here, after every finding is rendered
+    if RESOURCE_OVERFLOW_TARGET == "csv":
+        write_resource_csv(resource_csv_path(OUTPUT_PATH), overflowing_findings)
+    else:
+        add_resource_appendix(doc, overflowing_findings)
+
+# Order of the findings in the report: "scan" (first appearance in the export) or
+# "priority" (severity, then exploitability, then CVSS score, highest first)
+FINDING_ORDER = "scan"
+
+# Exports of other scanners from the same engagement (OpenVAS, Qualys, Burp Suite, .nessus, ...),
+# merged with the CSV into one report. Their format is detected from the file header.
+ADDITIONAL_SCANS = []
+
+# Reuse the grouped findings of an unchanged scan file from .scan_cache instead of parsing it again
+SCAN_CACHE = True
+
+# Path of a SQLite findings store (e.g. 'findings.db'), when set scans are imported into it and
+# the report is rendered from a query instead of the export
+FINDINGS_STORE = None
+
+# Previous scan of the same client (any supported scanner export), when set a retest report with only the
+# new and resolved findings since that scan is rendered
+PREVIOUS_SCAN = None
+
+# "docx" for the Word report, "html" for a quick preview page (HTML_PATH) without python-docx rendering
+OUTPUT_FORMAT = "docx"
+
+# Write the remediation tracker (one row per finding and host:port) next to the report
+EXPORT_TRACKER = True
+
+# How the CSV is read: "text" (csv module over the decoded stream) or "mmap"
+# (records found in the memory-mapped bytes, only the required columns decoded)
+CSV_READER = "mmap"
+
+# Worker processes for ingestion, above 1 the CSV is parsed in byte ranges by a process pool (mmap reader)
+CSV_WORKERS = 1
+
+def group_vulnerabilities(rows):
+    """
+    Group row dicts by vulnerability name, collecting the affected host:port of every row.
+    A finding's exploitability is the highest of its rows.
+    """
+    grouped_vulnerabilities = {}
+
+    # Counter for finding IDs
+    finding_id_counter = 1
+
+    # Process each row in the CSV
+    for row_count, row in enumerate(rows, 1):
+        logger.info(f"Processing row {row_count}")
+
+        try:
+            vulnerability_name = row['name']
+            plugin_id = row['plugin_id']
+            affected_host = f"{row['host']}:{row['port']}"
+            exploitability, exploitability_label = classify_row(row)
+
+            if vulnerability_name in grouped_vulnerabilities:
+                finding = grouped_vulnerabilities[vulnerability_name]
+                finding["affected_resource"].add(affected_host)
+                tool = row.get('tool', "Nessus")
+                if tool not in finding["tool"]:
+                    finding["tool"] = f"{finding['tool']}, {tool}"
+                if exploitability > finding["exploitability"]:
+                    finding["exploitability"] = exploitability
+                    finding["remote_exploitability"] = exploitability_label
+            else:
+                # Assign a new finding ID and store all required details
+                grouped_vulnerabilities[vulnerability_name] = {
+                    "name": vulnerability_name,
+                    "plugin_id": plugin_id,
+                    "tool": row.get('tool', "Nessus"),
+                    "finding_id": f"ABCXYZ-{finding_id_counter}",
+                    "description": summarize_description(row['description'], plugin_id),
+                    "cvs_score": row['cvs_score'],
+                    "risk_factor": row['risk_factor'],
+                    "severity": Severity.from_risk(row['risk_factor']),
+                    "exploitability": exploitability,
+                    "remote_exploitability": exploitability_label,
+                    "affected_resource": {affected_host},
+                    "mitigation": row['mitigation'],
+                    "references": parse_references(row['references'], plugin_id),
+                }
+                finding_id_counter += 1  # Increment counter
+
+            logger.info(f"Successfully processed vulnerability: {vulnerability_name}")
+
+        except Exception as e:
+            logger.error(f"Error processing row {row_count}: {str(e)}")
+            logger.warning(f"Skipping row {row_count} due to processing error")
+            continue
+
+    return grouped_vulnerabilities
+
+def group_csv_range(csv_file_path, fields, columns, start, end):
+    """Group the rows of one byte range of the CSV, runs in a worker process."""
+    return group_vulnerabilities(
+        dict(zip(fields, values)) for values in iter_projected_rows(csv_file_path, columns, start=start, end=end)
+    )
+
+def merge_grouped_vulnerabilities(partials):
+    """Merge per-range (or per-file) groupings in order, numbering findings exactly as a serial run would."""
+    merged = {}
+    for partial in partials:
+        for vulnerability_name, finding in partial.items():
+            if vulnerability_name in merged:
+                merged_finding = merged[vulnerability_name]
+                merged_finding["affected_resource"] |= finding["affected_resource"]
+                for tool in finding["tool"].split(", "):
+                    if tool not in merged_finding["tool"]:
+                        merged_finding["tool"] = f"{merged_finding['tool']}, {tool}"
+                if finding["exploitability"] > merged_finding["exploitability"]:
+                    merged_finding["exploitability"] = finding["exploitability"]
+                    merged_finding["remote_exploitability"] = finding["remote_exploitability"]
+            else:
+                # First occurrence in the file, so the next serial finding ID
+                finding["finding_id"] = f"ABCXYZ-{len(merged) + 1}"
+                merged[vulnerability_name] = finding
+    return merged
+
+def load_grouped_vulnerabilities_parallel(csv_file_path, workers=CSV_WORKERS):
+    """Parse byte ranges of the CSV in a process pool and merge their groupings deterministically."""
+    header, _ = read_header(csv_file_path, errors='ignore')
+    logger.info(f"CSV header read successfully with {len(header)} columns")
+    fields, columns = projected_columns(header)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # A few ranges per worker so one slow range doesn't hold up the rest
+        ranges = split_ranges(csv_file_path, workers * 4, pool.map)
+        logger.info(f"Parsing {len(ranges)} byte ranges with {workers} workers")
+        partials = pool.map(
+            group_csv_range,
+            [csv_file_path] * len(ranges),
+            [fields] * len(ranges),
+            [columns] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+        )
+        return merge_grouped_vulnerabilities(partials)
+
+def load_grouped_vulnerabilities(csv_file_path, reader=CSV_READER, workers=CSV_WORKERS):
+    """Read the scan export and return its findings grouped by vulnerability name."""
     try:
-        # Create a new document
-        doc = Document()
-        logger.info("Created new document")
-        
-        set_document_font(doc, "Helvetica", 10.5)
-        grouped_vulnerabilities = {}  
+        if workers > 1 and reader == "mmap" and detect_format(csv_file_path).name == "nessus_csv":
+            return load_grouped_vulnerabilities_parallel(csv_file_path, workers)
+        return group_vulnerabilities(iter_scan_rows(csv_file_path, reader))
+    except csv.Error as e:
+        logger.error(f"CSV parsing error: {str(e)}")
+        raise
+
+def load_engagement_findings(scan_paths, reader=CSV_READER):
+    """Group the rows of several exports, of any supported scanners, into one set of findings."""
+    return group_vulnerabilities(chain.from_iterable(iter_scan_rows(scan_path, reader) for scan_path in scan_paths))
+
+def load_grouped_from_store(csv_file_path, db_path=None, min_severity=None):
+    """Import the export into the SQLite findings store (once per file content) and group the stored rows."""
+    conn = connect_store(db_path or FINDINGS_STORE)
+    try:
+        scan_id = import_scan(conn, csv_file_path, scan_digest(csv_file_path), iter_scan_rows(csv_file_path, CSV_READER))
+        return group_vulnerabilities(iter_store_rows(conn, scan_id, min_severity))
+    finally:
+        conn.close()
+
+def load_scan_delta(previous_path, current_path):
+    """
+    Diff two scans per (Plugin ID, host, port) and group the new and resolved rows into findings.
+    Findings keep the finding ID they have in the report of their own scan.
+    """
+    previous = index_scan(iter_scan_rows(previous_path, CSV_READER))
+    current = index_scan(iter_scan_rows(current_path, CSV_READER))
+    delta = diff_scans(previous, current)
+
+    new_findings = group_vulnerabilities(delta_rows(current, delta.new))
+    resolved_findings = group_vulnerabilities(delta_rows(previous, delta.resolved))
+    for findings, index in ((new_findings, current), (resolved_findings, previous)):
+        for vulnerability_name, finding in findings.items():
+            finding["finding_id"] = f"ABCXYZ-{index.finding_numbers[vulnerability_name]}"
+    return delta, new_findings, resolved_findings
+
+def label_delta_findings(new_findings, resolved_findings):
+    """New then resolved findings in one mapping, keyed by 'New: name' / 'Resolved: name'."""
+    changed_findings = {}
+    for status, findings in (("New", new_findings), ("Resolved", resolved_findings)):
+        for vulnerability_name, finding in findings.items():
+            changed_findings[f"{status}: {vulnerability_name}"] = finding
+    return changed_findings
+
+def render_delta_report(doc, delta, new_findings, resolved_findings, pagination=PAGINATION_MODE):
+    """Retest report: a summary of the changes, then the new and the resolved findings in the usual layout."""
+    doc.add_heading('Retest Summary', level=2)
+    table = doc.add_table(rows=4, cols=3)
+    table.style = 'Table Grid'
+    rows = [
+        ('Status', 'Findings', 'Affected Resources'),
+        ('New', str(len(new_findings)), str(len(delta.new))),
+        ('Resolved', str(len(resolved_findings)), str(len(delta.resolved))),
+        ('Persisting', str(len(delta.persisting_names)), str(len(delta.persisting))),
+    ]
+    for row, values in zip(table.rows, rows):
+        for cell, text in zip(row.cells, values):
+            cell.text = text
+    for cell in table.rows[0].cells:
+        make_cell_text_bold(cell)
+
+    changed_findings = label_delta_findings(new_findings, resolved_findings)
+    if changed_findings:
+        doc.add_page_break()
+        render_findings(doc, changed_findings, pagination)
+
+def _cvss(score):
+    try:
+        return float(score)
+    except ValueError:
+        return 0.0
+
+def prioritize_findings(grouped_vulnerabilities):
+    """Findings ordered by severity, exploitability and CVSS score, all computed at ingest."""
+    return dict(sorted(
+        grouped_vulnerabilities.items(),
+        key=lambda item: (item[1]["severity"], item[1]["exploitability"], _cvss(item[1]["cvs_score"])),
+        reverse=True,
+    ))
+
+def new_report(template=None, report_title=REPORT_TITLE):
+    """A new report document with its title filled in, and the docx_writer static_key of its styles."""
+    # Create a new document
+    doc = new_report_document(template)
+    logger.info("Created new document")
+
+    font_name, font_size = "Helvetica", 10.5
+
+    if template:
+        # The branded template brings its own fonts and layout, only fill its placeholders
+        fill_bookmark(doc, TITLE_BOOKMARK, report_title)
+        fill_bookmark(doc, DATE_BOOKMARK, datetime.now().strftime('%d %B %Y'))
+        static_key = template_static_key(template)
+        logger.info(f"Using report template: {template}")
+    else:
+        set_document_font(doc, font_name, font_size)
+        static_key = f"{font_name}|{font_size}"
 
         # Add a title
-        title = doc.add_heading('RNS DATA AUTOMATION', level=1)
+        title = doc.add_heading(report_title, level=1)
         title.alignment = 1  # Center align
         logger.info("Added document title")
+    return doc, static_key
+
+def main():
+    logger.info("Starting document creation process")
+    
+    try:
+        doc, static_key = new_report(REPORT_TEMPLATE, REPORT_TITLE)
         
-        csv_file_path = 'dataset.csv'
+        csv_file_path = SCAN_PATH
         logger.info(f"Using CSV file: {csv_file_path}")
 
         # Check if CSV file exists
@@ -546,100 +806,20 @@ def main():
             logger.error(f"CSV file not found: {csv_file_path}")
             raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
 
-        # Counter for finding IDs
-        finding_id_counter = 1
-
-        # Define the required fields and their corresponding column names
-        required_fields = {
-            'name': 'Name',
-            'description': 'Description',
-            'cvs_score': 'CVSS v3.0 Base Score',
-            'risk_factor': 'Risk Factor',
-            'host': 'Host',
-            'port': 'Port',
-            'mitigation': 'Solution',
-            'references': 'See Also'
-        }
-
-        # Open the CSV file and read its contents
+        # Open the CSV file, read and group its rows
         try:
-            with open(csv_file_path, 'r', encoding='utf-8', errors='ignore') as csv_file:
-                logger.info("Successfully opened CSV file")
-                
-                # Use a try-except block for CSV reading operations
-                try:
-                    csv_reader = csv.reader(csv_file)
-                    
-                    # Read the header row to determine column indices
-                    header = next(csv_reader)
-                    logger.info(f"CSV header read successfully with {len(header)} columns")
-                    
-                    # Create a mapping of column names to indices
-                    column_map = {}
-                    for i, column_name in enumerate(header):
-                        column_map[column_name] = i
-                    
-                    # Validate CSV columns
-                    valid, error_message = validate_csv_columns(column_map, required_fields)
-                    if not valid:
-                        logger.error(f"CSV validation failed: {error_message}")
-                        logger.info(f"Available columns: {', '.join(column_map.keys())}")
-                        raise ValueError(error_message)
-                    
-                    # Process each row in the CSV
-                    row_count = 0
-                    for csv_row_data in csv_reader:
-                        row_count += 1
-                        logger.info(f"Processing row {row_count}")
-                        
-                        try:
-                            # Extract data using column names instead of hardcoded indices
-                            vulnerability_name = csv_row_data[column_map[required_fields['name']]]
-                            host = csv_row_data[column_map[required_fields['host']]]
-                            port = csv_row_data[column_map[required_fields['port']]]
-                            affected_host = f"{host}:{port}"
-                            
-                            # Get other required fields
-                            description = csv_row_data[column_map[required_fields['description']]].split('.')[0]
-                            cvs_score = csv_row_data[column_map[required_fields['cvs_score']]]
-                            risk_factor = csv_row_data[column_map[required_fields['risk_factor']]]
-                            mitigation = csv_row_data[column_map[required_fields['mitigation']]]
-                            
-                            # Handle possible empty references
-                            references_idx = column_map[required_fields['references']]
-                            references = csv_row_data[references_idx].split('\n')[0] if csv_row_data[references_idx] else ""
-                        
-                            if vulnerability_name in grouped_vulnerabilities:
-                                grouped_vulnerabilities[vulnerability_name]["affected_resource"].add(affected_host)
-                            else:
-                                # Assign a new finding ID and store all required details
-                                grouped_vulnerabilities[vulnerability_name] = {
-                                    "name": vulnerability_name,
-                                    "finding_id": f"ABCXYZ-{finding_id_counter}",
-                                    "description": description,
-                                    "cvs_score": cvs_score,
-                                    "risk_factor": risk_factor,
-                                    "remote_exploitability": "Yes",
-                                    "affected_resource": {affected_host},
-                                    "mitigation": mitigation,
-                                    "references": references,
-                                }
-                                finding_id_counter += 1  # Increment counter
-                            
-                            logger.info(f"Successfully processed vulnerability: {vulnerability_name}")
-                        
-                        except IndexError as e:
-                            logger.error(f"Invalid data in row {row_count}: {str(e)}")
-                            logger.warning(f"Skipping row {row_count} due to missing or invalid data")
-                            continue
-                        except Exception as e:
-                            logger.error(f"Error processing row {row_count}: {str(e)}")
-                            logger.warning(f"Skipping row {row_count} due to processing error")
-                            continue 
-                
-                except csv.Error as e:
-                    logger.error(f"CSV parsing error: {str(e)}")
-                    raise
+            if PREVIOUS_SCAN:
+                delta, grouped_vulnerabilities, resolved_vulnerabilities = load_scan_delta(PREVIOUS_SCAN, csv_file_path)
+            elif ADDITIONAL_SCANS:
+                grouped_vulnerabilities = load_engagement_findings([csv_file_path, *ADDITIONAL_SCANS])
+            elif FINDINGS_STORE:
+                grouped_vulnerabilities = load_grouped_from_store(csv_file_path)
+            elif SCAN_CACHE:
+                grouped_vulnerabilities = cached_grouped_vulnerabilities(
+                    csv_file_path, partial(load_grouped_vulnerabilities, reader=CSV_READER, workers=CSV_WORKERS)
+                )
+            else:
+                grouped_vulnerabilities = load_grouped_vulnerabilities(csv_file_path, CSV_READER, CSV_WORKERS)
         
         except FileNotFoundError:
             logger.error(f"CSV file not found: {csv_file_path}")
@@ -651,35 +831,41 @@ def main():
             logger.error(f"Unexpected error when reading CSV file: {str(e)}")
             raise
 
-        # Check if we have any vulnerabilities to process
-        if not grouped_vulnerabilities:
+        # Check if we have any vulnerabilities to process (a retest without changes still gets its summary)
+        if not grouped_vulnerabilities and not PREVIOUS_SCAN:
             logger.warning("No valid vulnerabilities found in the CSV file")
             raise ValueError("No valid vulnerabilities found in the CSV file")
 
         logger.info(f"Found {len(grouped_vulnerabilities)} unique vulnerabilities")
-
-        # Create tables for each vulnerability
-        for index, (vulnerability_name, data_to_append) in enumerate(grouped_vulnerabilities.items()):
-            logger.info(f"Creating table for vulnerability {index + 1}: {vulnerability_name}")
-            
-            # Fix: Strip spaces before joining affected resources
-            data_to_append["affected_resource"] = "\n".join(res.strip() for res in sorted(data_to_append["affected_resource"]))
-
-            # Create the table
-            numbered_finding_name = f"{index + 1}. {vulnerability_name}"
-            create_table(doc, numbered_finding_name)
-        
-            # Add new page except for the last vulnerability
-            if index < len(grouped_vulnerabilities) - 1:
-                doc.add_section(WD_SECTION.NEW_PAGE)
-                logger.info("Added new page for next vulnerability")
-            
-            append_data(doc, index, data_to_append, KEYWORDS)
+        if FINDING_ORDER == "priority":
+            grouped_vulnerabilities = prioritize_findings(grouped_vulnerabilities)
+
+        # Before rendering, which replaces the resource sets with their joined text
+        if EXPORT_TRACKER:
+            write_tracker(grouped_vulnerabilities, tracker_path(HTML_PATH if OUTPUT_FORMAT == "html" else OUTPUT_PATH))
+
+        if OUTPUT_FORMAT == "html":
+            if PREVIOUS_SCAN:
+                grouped_vulnerabilities = label_delta_findings(grouped_vulnerabilities, resolved_vulnerabilities)
+            write_html_report(grouped_vulnerabilities, HTML_PATH, REPORT_TITLE,
+                              partial(get_module_name, predefined_keywords=KEYWORDS))
+            logger.info("Document creation process completed successfully")
+            return True
+
+        first_rendered = len(doc.element.body) - 1  # Everything from here on is rendered content
+        if PREVIOUS_SCAN:
+            render_delta_report(doc, delta, grouped_vulnerabilities, resolved_vulnerabilities)
+        else:
+            render_findings(doc, grouped_vulnerabilities)
+        if REPORT_TEMPLATE:
+            place_rendered_content(doc, first_rendered, FINDINGS_BOOKMARK)
 
         # Save the document
         try:
-            doc.save('output_document.docx')
-            logger.info("Document saved successfully as 'output_document.docx'")
+            # Styles and theme only depend on the fonts or the template, their serialized form is cached
+            save_document(doc, OUTPUT_PATH, compression=OUTPUT_COMPRESSION,
+                          static_key=static_key)
+            logger.info(f"Document saved successfully as '{OUTPUT_PATH}'")
         except PermissionError:
             logger.error("Permission denied when saving the document. Check if the file is open in another application.")
             raise
@@ -0,0 +1,300 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Localhost only, the service has no authentication
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8350
+
+# Warm worker processes, each renders one report at a time
+SERVICE_WORKERS = 2
+
+# Jobs that may wait for a free worker, more are turned away with 503
+SERVICE_QUEUE = 8
+
+# Largest accepted upload, and seconds a request waits for its report
+MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
+SERVICE_JOB_TIMEOUT = 600
+
+# Bytes per read while spooling an upload to disk
+UPLOAD_CHUNK = 1024 * 1024
+
+CONTENT_TYPES = {
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'html': 'text/html; charset=utf-8',
+}
+
+# One synthetic row, rendered once per worker so the first real job finds every cache filled
+_WARM_ROW = {
+    'plugin_id': '0', 'name': 'Service warm-up', 'description': 'Warm-up finding.', 'cvs_score': '5.0',
+    'risk_factor': 'Medium', 'host': '127.0.0.1', 'port': '0', 'mitigation': 'ignore it',
+    'references': 'https://localhost/',
+}
+
+_report_title = None  # The worker's default title, a job may override it for its own report
+
+
+def _warm_worker(template, title):
+    """
+    Worker initializer: import the pipeline, parse the template and render one finding
+    into memory, which fills the template, style and static part caches of the process.
+    """
+    global _report_title
+    import io
+
+    import script5
+    from docx_writer import save_document
+
+    script5.REPORT_TEMPLATE = template
+    if title:
+        script5.REPORT_TITLE = title
+    _report_title = script5.REPORT_TITLE
+    script5.SCAN_CACHE = False  # Its key includes the mtime, so a fresh upload would never hit it
+    script5.EXPORT_TRACKER = False
+    doc, static_key = script5.new_report(template, _report_title)
+    script5.render_findings(doc, script5.group_vulnerabilities([_WARM_ROW]))
+    save_document(doc, io.BytesIO(), compression=script5.OUTPUT_COMPRESSION, static_key=static_key)
+    logger.info(f"Worker {os.getpid()} is warm")
+    return os.getpid()
+
+
+def _reset_job_caches():
+    """
+    Drop what one job left in the process-wide memos. They are keyed on plugin IDs and
+    resources of the job's scan, and would otherwise grow with every upload. The next
+    job also sees a knowledge base created since.
+    """
+    from knowledge_base import reload_knowledge_base
+    from references import clear_references
+    from resources import parse_resource
+    from summarize import clear_summaries
+
+    clear_summaries()
+    clear_references()
+    reload_knowledge_base()
+    parse_resource.cache_clear()
+
+
+def render_upload(scan_path, output_path, output_format="docx", order="scan", title=None):
+    """Render one uploaded export with the warm pipeline, runs in a worker process."""
+    import script5
+    from scanner_formats import detect_format
+
+    _reset_job_caches()
+    detect_format(scan_path)  # An unknown format fails here, with a message worth returning
+    script5.SCAN_PATH = scan_path
+    script5.OUTPUT_FORMAT = output_format
+    script5.FINDING_ORDER = order
+    script5.REPORT_TITLE = title or _report_title
+    script5.OUTPUT_PATH = script5.HTML_PATH = output_path
+    if not script5.main():
+        raise RuntimeError("Report rendering failed, see the service log")
+    return output_path
+
+
+class ReportService(ThreadingHTTPServer):
+    """
+    HTTP front of a pool of warm worker processes. Each request spools its upload to a
+    temporary directory, a worker renders it there and the report is streamed back.
+    At most workers + queue jobs are accepted at a time, the rest get 503.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=(SERVICE_HOST, SERVICE_PORT), workers=SERVICE_WORKERS, queue=SERVICE_QUEUE,
+                 template=None, title=None, work_dir=None):
+        self.workers = workers
+        self.pool_args = (template, title)
+        # The pool forks before any request thread exists, every worker warms up in parallel
+        self.executor = self._new_executor()
+        self.executor_lock = threading.Lock()
+        self.capacity = workers + queue
+        self.jobs = 0  # Running and waiting jobs
+        self.jobs_lock = threading.Lock()
+        self.work_dir = work_dir
+        super().__init__(address, ReportRequestHandler)
+
+    def _new_executor(self):
+        executor = ProcessPoolExecutor(self.workers, initializer=_warm_worker, initargs=self.pool_args)
+        executor.submit(os.getpid).result()
+        return executor
+
+    def replace_broken_pool(self):
+        """
+        Swap a pool that lost a worker for a new warm one, every later submit would fail
+        on it. Requests that saw the same failure find the new pool and leave it be. This
+        pool forks while request threads run, which is safe as long as no thread holds a
+        lock the workers need, and the pipeline takes none outside a worker.
+        """
+        with self.executor_lock:
+            try:
+                self.executor.submit(os.getpid)
+                return
+            except BrokenProcessPool:
+                pass
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._new_executor()
+        logger.warning("Replaced the worker pool after a worker died")
+
+    def submit(self, *args):
+        """Queue a render_upload job, or return None when the queue is full."""
+        with self.jobs_lock:
+            if self.jobs >= self.capacity:
+                return None
+            self.jobs += 1
+        with self.executor_lock:
+            executor = self.executor
+        try:
+            future = executor.submit(render_upload, *args)
+        except BrokenProcessPool:
+            # The pool broke between jobs, nothing else would notice
+            self._job_done()
+            self.replace_broken_pool()
+            return self.submit(*args)
+        except Exception:
+            self._job_done()
+            raise
+        # The job counts until the worker is done with it, even if the client gave up waiting
+        future.add_done_callback(self._job_done)
+        return future
+
+    def _job_done(self, future=None):
+        with self.jobs_lock:
+            self.jobs -= 1
+
+    def server_close(self):
+        super().server_close()
+        with self.executor_lock:
+            self.executor.shutdown(cancel_futures=True)
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /render?format=docx|html&order=scan|priority&title=...  with the scan export as the body
+    GET /health
+    """
+
+    server_version = "VAPTReport/1.0"
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != '/health':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        server = self.server
+        self._send_json(HTTPStatus.OK, {'workers': server.workers, 'jobs': server.jobs, 'capacity': server.capacity})
+
+    def _spool_upload(self, path):
+        """Copy the request body to path in chunks, returns False after answering a bad upload."""
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            self.send_error(HTTPStatus.LENGTH_REQUIRED, "Send the scan export with a Content-Length")
+            return False
+        remaining = int(length)
+        if remaining > MAX_UPLOAD_BYTES:
+            self.send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Uploads are limited to {MAX_UPLOAD_BYTES} bytes")
+            return False
+        with open(path, 'wb') as upload:
+            while remaining:
+                chunk = self.rfile.read(min(UPLOAD_CHUNK, remaining))
+                if not chunk:
+                    self.send_error(HTTPStatus.BAD_REQUEST, "Upload ended before Content-Length bytes")
+                    return False
+                upload.write(chunk)
+                remaining -= len(chunk)
+        return True
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/render':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        output_format = query.get('format', 'docx')
+        order = query.get('order', 'scan')
+        if output_format not in CONTENT_TYPES or order not in ('scan', 'priority'):
+            self.send_error(HTTPStatus.BAD_REQUEST, "format must be docx or html, order scan or priority")
+            return
+
+        job_dir = tempfile.mkdtemp(prefix='vapt_job_', dir=self.server.work_dir)
+        future = None
+        try:
+            scan_path = os.path.join(job_dir, 'upload')
+            if not self._spool_upload(scan_path):
+                return
+            output_path = os.path.join(job_dir, f"report.{output_format}")
+            future = self.server.submit(scan_path, output_path, output_format, order, query.get('title'))
+            if future is None:
+                self.send_response(HTTPStatus.SERVICE_UNAVAILABLE)
+                self.send_header('Retry-After', '5')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            try:
+                future.result(timeout=SERVICE_JOB_TIMEOUT)
+            except TimeoutError:
+                self.send_error(HTTPStatus.GATEWAY_TIMEOUT, "The report is still rendering")
+                return
+            except ValueError as e:
+                # Unrecognized export format
+                self.send_error(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, str(e).replace(scan_path, 'upload'))
+                return
+            except BrokenProcessPool as e:
+                logger.error(f"Worker pool failed: {str(e)}")
+                self.server.replace_broken_pool()
+                self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "A worker process died")
+                return
+            except RuntimeError as e:
+                self.send_error(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+                return
+            self._send_report(output_path, output_format)
+        finally:
+            # After a timeout the worker is still rendering into the directory, it goes once the job is done
+            if future is None:
+                shutil.rmtree(job_dir, ignore_errors=True)
+            else:
+                future.add_done_callback(lambda _: shutil.rmtree(job_dir, ignore_errors=True))
+
+    def _send_report(self, output_path, output_format):
+        with open(output_path, 'rb') as report_file:
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', CONTENT_TYPES[output_format])
+            self.send_header('Content-Length', str(os.fstat(report_file.fileno()).st_size))
+            self.send_header('Content-Disposition', f'attachment; filename="report.{output_format}"')
+            self.end_headers()
+            try:
+                # Straight from the page cache to the socket
+                self.connection.sendfile(report_file)
+            except (BrokenPipeError, ConnectionResetError):
+                logger.warning(f"{self.address_string()} disconnected before the report was sent")
+
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS, queue=SERVICE_QUEUE, template=None,
+          title=None):
+    """Run the report service until interrupted."""
+    service = ReportService((host, port), workers, queue, template, title)
+    logger.info(f"Serving reports on http://{host}:{service.server_port} with {workers} warm workers")
+    try:
+        service.serve_forever()
+    finally:
+        service.server_close()
@@ -0,0 +1,88 @@
+import logging
+from collections import namedtuple
+from copy import deepcopy
+from enum import IntEnum
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+class Severity(IntEnum):
+    """Risk tiers, ordered so that sorting by value puts the most severe last."""
+    NONE = 0
+    INFORMATIONAL = 1
+    LOW = 2
+    MEDIUM = 3
+    HIGH = 4
+    CRITICAL = 5
+
+    @classmethod
+    def from_risk(cls, risk_factor):
+        """Normalize a scanner risk value ('High', ' critical', 'Info', ...) once at ingest."""
+        return _ALIASES.get((risk_factor or "").strip().lower(), cls.NONE)
+
+    @property
+    def label(self):
+        return SEVERITY_STYLES[self].label
+
+    @property
+    def fill(self):
+        return SEVERITY_STYLES[self].fill
+
+
+_ALIASES = {
+    "critical": Severity.CRITICAL,
+    "high": Severity.HIGH,
+    "medium": Severity.MEDIUM,
+    "moderate": Severity.MEDIUM,
+    "low": Severity.LOW,
+    "informational": Severity.INFORMATIONAL,
+    "info": Severity.INFORMATIONAL,
+    "information": Severity.INFORMATIONAL,  # Burp Suite
+    "log": Severity.INFORMATIONAL,  # OpenVAS
+    "none": Severity.NONE,
+}
+
+SeverityStyle = namedtuple('SeverityStyle', ['label', 'fill', 'text_color'])
+
+# One table drives the finding cells, charts and summaries
+SEVERITY_STYLES = {
+    Severity.CRITICAL: SeverityStyle("Critical", "800000", "FFFFFF"),
+    Severity.HIGH: SeverityStyle("High", "FFC404", "000000"),
+    Severity.MEDIUM: SeverityStyle("Medium", "FFFF00", "000000"),
+    Severity.LOW: SeverityStyle("Low", "008000", "FFFFFF"),
+    Severity.INFORMATIONAL: SeverityStyle("Informational", "3366FF", "FFFFFF"),
+    Severity.NONE: SeverityStyle("None", None, "000000"),
+}
+
+
+@lru_cache(maxsize=None)
+def _style_elements(severity):
+    """
+    Build the shading and text color elements of a tier once per process. python-docx is
+    only imported here, so ingest, the tracker and the HTML preview don't load it.
+    """
+    from docx.oxml.shared import OxmlElement, qn
+
+    style = SEVERITY_STYLES[severity]
+    shading = None
+    if style.fill:
+        shading = OxmlElement('w:shd')
+        shading.set(qn('w:val'), 'clear')
+        shading.set(qn('w:color'), 'auto')
+        shading.set(qn('w:fill'), style.fill)
+    color = OxmlElement('w:color')
+    color.set(qn('w:val'), style.text_color)
+    return shading, color
+
+
+def apply_severity_style(cell, severity):
+    """Write the tier label into the cell and apply its prebuilt shading and text color."""
+    style = SEVERITY_STYLES[severity]
+    shading, color = _style_elements(severity)
+    cell.text = style.label
+    if shading is not None:
+        cell._tc.get_or_add_tcPr().append(deepcopy(shading))
+    for run in cell.paragraphs[0].runs:
+        run._r.get_or_add_rPr().append(deepcopy(color))
+    logger.debug(f"Applied {style.label} severity style")
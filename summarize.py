@@ -0,0 +1,53 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Candidate sentence ends: terminal punctuation followed by whitespace and a capital letter
+# (so 'Log4j 1.2' and 'e.g. the' never match), or a blank line between paragraphs, \n or \r\n
+_BOUNDARY = re.compile(r'[.!?](?=\s+["\'(\[]?[A-Z])|\r?\n[ \t]*\r?\n')
+
+# A blank line and the whitespace around it, joined to one space when a lead-in runs on
+_PARAGRAPH_BREAK = re.compile(r'\s*\r?\n[ \t]*\r?\n\s*')
+
+# Abbreviations that end in a period without ending the sentence
+_ABBREVIATION = re.compile(
+    r'(?:^|[\s(])(?:e\.g|i\.e|etc|vs|cf|approx|incl|no|Inc|Ltd|Corp|Co|Mr|Ms|Dr|St|[A-Z])\.$',
+    re.IGNORECASE,
+)
+
+_summaries = {}  # plugin id -> first sentence
+
+
+def first_sentence(text):
+    """
+    Return the first real sentence of text, scanning only up to its end.
+    A paragraph that ends without terminal punctuation, such as a lead-in ending in ':',
+    runs on into the next one. Text without a sentence boundary is returned whole.
+    """
+    for match in _BOUNDARY.finditer(text):
+        end = match.start()
+        if text[end] in '\r\n':
+            if text[:end].rstrip().endswith(('.', '!', '?')):
+                return _PARAGRAPH_BREAK.sub(' ', text[:end].strip())
+            continue
+        # Look at a short window only, never at the rest of a multi-KB description
+        if _ABBREVIATION.search(text[max(0, end - 8):end + 1]):
+            continue
+        return _PARAGRAPH_BREAK.sub(' ', text[:end + 1].strip())
+    return _PARAGRAPH_BREAK.sub(' ', text.strip())
+
+
+def clear_summaries():
+    """Forget the memoized summaries, e.g. between the jobs of a long-lived worker."""
+    _summaries.clear()
+
+
+def summarize_description(description, plugin_id=None):
+    """First sentence of a plugin description, computed once per Plugin ID."""
+    if plugin_id is None:
+        return first_sentence(description)
+    summary = _summaries.get(plugin_id)
+    if summary is None:
+        summary = _summaries[plugin_id] = first_sentence(description)
+    return summary
@@ -0,0 +1,49 @@
+import csv
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from summarize import first_sentence  # noqa: E402
+
+
+def read_descriptions(csv_path):
+    with open(csv_path, 'r', encoding='utf-8', errors='ignore', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        index = next(reader).index('Description')
+        return [row[index] for row in reader if len(row) > index]
+
+
+class FirstSentenceTest(unittest.TestCase):
+
+    def test_sentence_end(self):
+        self.assertEqual(first_sentence("The host is vulnerable. Update it."), "The host is vulnerable.")
+
+    def test_abbreviation_is_not_an_end(self):
+        text = "Some services, e.g. Telnet, send passwords in clear text. Disable them."
+        self.assertEqual(first_sentence(text), "Some services, e.g. Telnet, send passwords in clear text.")
+
+    def test_lead_in_runs_on(self):
+        text = "From Red Hat Security Advisory 2024:1234 :\n\nThe kernel packages contain the Linux kernel. More."
+        self.assertEqual(
+            first_sentence(text),
+            "From Red Hat Security Advisory 2024:1234 : The kernel packages contain the Linux kernel.",
+        )
+
+    def test_crlf_paragraph_break(self):
+        text = "The remote host is missing an update\r\n\r\nIt fixes several flaws."
+        self.assertEqual(first_sentence(text), "The remote host is missing an update It fixes several flaws.")
+        self.assertEqual(first_sentence("Version 1.2 is affected.\r\n\r\nUpgrade"), "Version 1.2 is affected.")
+
+    def test_no_dataset_summary_is_a_lead_in(self):
+        lead_ins = [
+            summary for summary in map(first_sentence, read_descriptions(os.path.join(ROOT, 'dataset.csv')))
+            if summary.endswith(':')
+        ]
+        self.assertEqual(lead_ins, [], f"{len(lead_ins)} summaries end in ':'")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import csv
+import logging
+import os
+from itertools import chain, islice
+
+from resources import sort_resources
+from severity import SEVERITY_STYLES
+
+logger = logging.getLogger(__name__)
+
+TRACKER_COLUMNS = (
+    'Finding ID', 'Finding', 'Severity', 'CVSS v3.0', 'Remote Exploitability', 'Host', 'Port', 'Plugin ID',
+    'Status', 'Owner', 'Target Date', 'Notes',
+)
+TRACKER_WIDTHS = (14, 60, 14, 10, 22, 18, 8, 10, 12, 20, 14, 40)
+SEVERITY_COLUMN = TRACKER_COLUMNS.index('Severity')
+
+# Rows of an Excel worksheet, header included, larger trackers continue on 'Tracker 2', 'Tracker 3', ...
+SHEET_ROWS = 1048576
+
+
+def tracker_path(report_path):
+    """Where the tracker of a report goes, next to it: reports/acme.docx -> reports/acme_tracker.xlsx."""
+    return os.path.splitext(report_path)[0] + '_tracker.xlsx'
+
+
+def _resources(finding):
+    # Rendering joins the set into one string, the tracker accepts both forms
+    resources = finding['affected_resource']
+    if isinstance(resources, str):
+        resources = resources.split('\n')
+    return sort_resources(resources)
+
+
+def iter_tracker_rows(grouped_vulnerabilities):
+    """(severity, row values) per (finding, host:port), in report order."""
+    for finding in grouped_vulnerabilities.values():
+        severity = finding['severity']
+        for resource in _resources(finding):
+            host, _, port = resource.rpartition(':')
+            yield severity, (
+                finding['finding_id'], finding['name'], severity.label, finding['cvs_score'],
+                finding.get('remote_exploitability', ''), host, port, finding.get('plugin_id', ''),
+                'Open', '', '', '',
+            )
+
+
+def _sheets(rows):
+    """
+    (worksheet name, rows) per worksheet, each with at most SHEET_ROWS - 1 rows below its header.
+    The rows stay a stream, a worksheet's rows must be consumed before the next one is asked for.
+    """
+    rows = iter(rows)
+    yield 'Tracker', islice(rows, SHEET_ROWS - 1)
+    number = 1
+    for first in rows:
+        number += 1
+        yield f"Tracker {number}", chain((first,), islice(rows, SHEET_ROWS - 2))
+
+
+def _writer():
+    """The first constant-memory xlsx library installed: ('xlsxwriter' | 'openpyxl', module), or None."""
+    try:
+        import xlsxwriter
+        return 'xlsxwriter', xlsxwriter
+    except ImportError:
+        pass
+    try:
+        import openpyxl
+        return 'openpyxl', openpyxl
+    except ImportError:
+        return None
+
+
+def _write_xlsxwriter(xlsxwriter, path, rows):
+    # constant_memory flushes every row once the next one starts, so rows must come in order
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    header = workbook.add_format({'bold': True, 'bg_color': '#C0D4EC'})
+    formats = {
+        severity: workbook.add_format({'bg_color': f"#{style.fill}", 'font_color': f"#{style.text_color}"})
+        for severity, style in SEVERITY_STYLES.items() if style.fill
+    }
+    total = 0
+    for name, sheet_rows in _sheets(rows):
+        worksheet = workbook.add_worksheet(name)
+        for column, width in enumerate(TRACKER_WIDTHS):
+            worksheet.set_column(column, column, width)
+        worksheet.write_row(0, 0, TRACKER_COLUMNS, header)
+        worksheet.freeze_panes(1, 0)
+
+        # write_string skips write()'s number/URL sniffing, empty cells are not written at all
+        write_string = worksheet.write_string
+        row_count = 0
+        for row_count, (severity, values) in enumerate(sheet_rows, 1):
+            for column, value in enumerate(values):
+                if value:
+                    cell_format = formats.get(severity) if column == SEVERITY_COLUMN else None
+                    write_string(row_count, column, value, cell_format)
+        worksheet.autofilter(0, 0, row_count, len(TRACKER_COLUMNS) - 1)
+        total += row_count
+    workbook.close()
+    return total
+
+
+def _write_openpyxl(openpyxl, path, rows):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    workbook = openpyxl.Workbook(write_only=True)
+    header_fill = PatternFill('solid', fgColor='C0D4EC')
+    styles = {
+        severity: (PatternFill('solid', fgColor=style.fill), Font(color=style.text_color))
+        for severity, style in SEVERITY_STYLES.items() if style.fill
+    }
+    total = 0
+    for name, sheet_rows in _sheets(rows):
+        worksheet = workbook.create_sheet(name)
+        for column, width in enumerate(TRACKER_WIDTHS):
+            worksheet.column_dimensions[get_column_letter(column + 1)].width = width
+        worksheet.freeze_panes = 'A2'
+
+        header = []
+        for title in TRACKER_COLUMNS:
+            cell = WriteOnlyCell(worksheet, value=title)
+            cell.font = Font(bold=True)
+            cell.fill = header_fill
+            header.append(cell)
+        worksheet.append(header)
+
+        row_count = 0
+        for row_count, (severity, values) in enumerate(sheet_rows, 1):
+            values = list(values)
+            if severity in styles:
+                cell = WriteOnlyCell(worksheet, value=values[SEVERITY_COLUMN])
+                cell.fill, cell.font = styles[severity]
+                values[SEVERITY_COLUMN] = cell
+            worksheet.append(values)
+        total += row_count
+    workbook.save(path)
+    return total
+
+
+def _write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(TRACKER_COLUMNS)
+        count = 0
+        for count, (_, values) in enumerate(rows, 1):
+            writer.writerow(values)
+    return count
+
+
+def write_tracker(grouped_vulnerabilities, path):
+    """
+    Write the remediation tracker, one row per (finding, host:port), streamed so the
+    workbook is never held in memory. Uses xlsxwriter or openpyxl, whichever is installed,
+    and a .csv next to path when neither is. Rows past an xlsx worksheet's limit continue
+    on the next worksheet. Returns the path written.
+    """
+    rows = iter_tracker_rows(grouped_vulnerabilities)
+    writer = _writer()
+    if writer is None:
+        path = os.path.splitext(path)[0] + '.csv'
+        logger.warning(f"Neither xlsxwriter nor openpyxl is installed, writing the tracker as {path}")
+        count = _write_csv(path, rows)
+    elif writer[0] == 'xlsxwriter':
+        count = _write_xlsxwriter(writer[1], path, rows)
+    else:
+        count = _write_openpyxl(writer[1], path, rows)
+    logger.info(f"Wrote {count} tracker rows to {path}")
+    return path
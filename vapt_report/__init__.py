@@ -0,0 +1,7 @@
+"""
+Command line entry point of the report pipeline: python -m vapt_report <command>.
+
+The pipeline modules (script5, the scanner adapters, the findings store, ...) live
+at the top of the repository. Commands import them only when they run, so --help
+and quick commands don't pay for python-docx, lxml or psycopg2.
+"""
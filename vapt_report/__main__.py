@@ -0,0 +1,5 @@
+import sys
+
+from vapt_report.cli import main
+
+sys.exit(main())
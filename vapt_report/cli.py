@@ -0,0 +1,155 @@
+import argparse
+
+
+def check(args):
+    from scan_check import check_passed, check_scan, format_check
+
+    passed = True
+    for scan_path in [args.scan, *args.add, *filter(None, [args.previous])]:
+        try:
+            result = check_scan(scan_path)
+        except (OSError, ValueError, SyntaxError) as e:
+            # Unreadable file, unknown format or malformed XML
+            print(f"{scan_path}: {str(e)}")
+            passed = False
+            continue
+        print("\n".join(format_check(result)))
+        passed = passed and check_passed(result)
+    return 0 if passed else 1
+
+
+def render(args):
+    if args.check:
+        return check(args)
+
+    import script5
+
+    script5.SCAN_PATH = args.scan
+    script5.ADDITIONAL_SCANS = args.add
+    script5.PREVIOUS_SCAN = args.previous
+    script5.FINDINGS_STORE = args.store
+    script5.OUTPUT_FORMAT = args.format
+    script5.FINDING_ORDER = args.order
+    script5.SCAN_CACHE = args.cache
+    script5.EXPORT_TRACKER = args.tracker
+    script5.CSV_WORKERS = args.workers
+    if args.template:
+        script5.REPORT_TEMPLATE = args.template
+    if args.title:
+        script5.REPORT_TITLE = args.title
+    if args.output:
+        if args.format == "html":
+            script5.HTML_PATH = args.output
+        else:
+            script5.OUTPUT_PATH = args.output
+    if args.watch:
+        from watch import watch
+
+        try:
+            watch(args.scan)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    return 0 if script5.main() else 1
+
+
+def import_scans(args):
+    from findings_store import connect_store, import_scan
+    from scan_cache import scan_digest
+    from scanner_formats import iter_scan_rows
+
+    conn = connect_store(args.db)
+    try:
+        for scan_path in args.scans:
+            scan_id = import_scan(conn, scan_path, scan_digest(scan_path), iter_scan_rows(scan_path))
+            print(f"{scan_path}: scan {scan_id}")
+    finally:
+        conn.close()
+    return 0
+
+
+def database(args):
+    import multi2
+
+    try:
+        multi2.main()
+    except ImportError as e:
+        print(f"The db command needs psycopg2: {str(e)}")
+        return 1
+    return 0
+
+
+def serve(args):
+    import logging
+
+    from service import serve as serve_reports
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        serve_reports(args.host, args.port, args.workers, args.queue, args.template, args.title)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def bench(args):
+    import bench
+
+    return bench.main(args.benchmarks)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='vapt_report', description="VAPT report automation")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    render_parser = commands.add_parser('render', help="build the report from one or more scan exports")
+    render_parser.add_argument('scan', nargs='?', default='dataset.csv',
+                               help="scan export, or a directory of exports with --watch (default: dataset.csv)")
+    render_parser.add_argument('--add', action='append', default=[], metavar='SCAN',
+                               help="another export of the same engagement, any supported scanner (repeatable)")
+    render_parser.add_argument('--previous', metavar='SCAN', help="previous scan, renders a retest report")
+    render_parser.add_argument('--store', metavar='DB', help="import into and render from this SQLite findings store")
+    render_parser.add_argument('--format', choices=('docx', 'html'), default='docx')
+    render_parser.add_argument('--order', choices=('scan', 'priority'), default='scan')
+    render_parser.add_argument('--output', help="report path (default: output_document.docx / .html)")
+    render_parser.add_argument('--template', help="client-branded .docx template")
+    render_parser.add_argument('--title', help="report title")
+    render_parser.add_argument('--workers', type=int, default=1, help="ingestion worker processes")
+    render_parser.add_argument('--check', action='store_true',
+                               help="only validate the exports and print their statistics, no report is built")
+    render_parser.add_argument('--watch', action='store_true',
+                               help="re-render whenever the export (or any export in the directory) changes")
+    render_parser.add_argument('--no-cache', dest='cache', action='store_false', help="don't use .scan_cache")
+    render_parser.add_argument('--no-tracker', dest='tracker', action='store_false',
+                               help="don't write the remediation tracker")
+    render_parser.set_defaults(handler=render)
+
+    import_parser = commands.add_parser('import', help="import scan exports into the SQLite findings store")
+    import_parser.add_argument('scans', nargs='+', metavar='SCAN')
+    import_parser.add_argument('--db', default='findings.db')
+    import_parser.set_defaults(handler=import_scans)
+
+    db_parser = commands.add_parser('db', help="interactive PostgreSQL menu (multi2)")
+    db_parser.set_defaults(handler=database)
+
+    serve_parser = commands.add_parser('serve', help="local HTTP service rendering uploaded exports with warm workers")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8350)
+    serve_parser.add_argument('--workers', type=int, default=2, help="warm worker processes")
+    serve_parser.add_argument('--queue', type=int, default=8, help="jobs that may wait for a worker before 503")
+    serve_parser.add_argument('--template', help="client-branded .docx template, parsed once per worker")
+    serve_parser.add_argument('--title', help="default report title, a request may pass its own")
+    serve_parser.set_defaults(handler=serve)
+
+    bench_parser = commands.add_parser('bench', help="run benchmarks from bench.py")
+    bench_parser.add_argument('benchmarks', nargs='*', metavar='benchmark[=argument]')
+    bench_parser.set_defaults(handler=bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'watch', False) and (args.previous or args.store or args.add):
+        parser.error("--watch can't be combined with --previous, --store or --add (watch a directory instead)")
+    return args.handler(args)
@@ -0,0 +1,262 @@
+import logging
+import os
+import time
+from functools import partial
+
+from docx.oxml.ns import qn
+
+import script5
+from csv_mmap import count_quotes, read_header
+from docx_writer import save_document
+from html_report import write_html_report
+from nessus_csv import projected_columns
+from report_template import FINDINGS_BOOKMARK, bookmark_anchor
+from resource_table import add_resource_appendix, appendix_bookmark, resource_csv_path, write_resource_csv
+from resources import sort_resources
+from scanner_formats import detect_format
+from tracker import tracker_path, write_tracker
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two looks at the watched files
+WATCH_INTERVAL = 0.5
+
+# Seconds the files must stay unchanged before a re-render, so a burst of saves renders once
+WATCH_DEBOUNCE = 1.0
+
+# Files of a watched directory that are treated as scan exports
+WATCH_EXTENSIONS = ('.csv', '.nessus', '.xml')
+
+# Bytes just before the parsed end that must be unchanged for a change to count as an append
+APPEND_CHECK_BYTES = 4096
+
+
+def _snapshot(target, ignored):
+    """(size, mtime) of the watched export, or of every export in the watched directory."""
+    if os.path.isdir(target):
+        paths = [
+            entry.path for entry in os.scandir(target)
+            if entry.is_file() and not entry.name.startswith('.') and entry.name.lower().endswith(WATCH_EXTENSIONS)
+        ]
+    else:
+        paths = [target]
+    snapshot = {}
+    for path in paths:
+        if os.path.abspath(path) in ignored:
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue  # Deleted, or an editor is replacing it
+        snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def iter_changes(target, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE, ignored=()):
+    """
+    Yield the watched export paths now and after every change, once the files have been
+    unchanged for debounce seconds. Polling os.stat needs no inotify binding and works
+    the same on network shares.
+    """
+    ignored = {os.path.abspath(path) for path in ignored}
+    rendered = None
+    while True:
+        snapshot = _snapshot(target, ignored)
+        if snapshot != rendered:
+            stable_since = time.monotonic()
+            while rendered is not None and time.monotonic() - stable_since < debounce:
+                time.sleep(interval)
+                current = _snapshot(target, ignored)
+                if current != snapshot:
+                    snapshot = current
+                    stable_since = time.monotonic()
+            rendered = snapshot
+            yield sorted(snapshot)
+        time.sleep(interval)
+
+
+class WatchedScan:
+    """Grouped findings of one export, kept between re-renders so an append only parses the new rows."""
+
+    def __init__(self, path):
+        self.path = path
+        self.grouped = {}
+        self.signature = None
+        self.projection = None  # (fields, columns) of a Nessus CSV read with the mmap reader
+        self.parsed_end = 0
+        self.quotes = 0  # Quote bytes parsed, odd when the file ended inside a quoted field
+        self.head = b''  # Header bytes and the last parsed bytes, both unchanged on an append
+        self.tail = b''
+
+    def _read(self, start, end):
+        with open(self.path, 'rb') as scan_file:
+            scan_file.seek(start)
+            return scan_file.read(end - start)
+
+    def _appended(self, size):
+        """True when the file only grew since the last parse, which ended on a complete record."""
+        if self.projection is None or size <= self.parsed_end or not self.tail.endswith(b'\n') or self.quotes % 2:
+            return False
+        return (self._read(0, len(self.head)) == self.head
+                and self._read(self.parsed_end - len(self.tail), self.parsed_end) == self.tail)
+
+    def update(self):
+        """Grouped findings of the file as it is now."""
+        stat = os.stat(self.path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature == self.signature:
+            return self.grouped
+
+        if self._appended(stat.st_size):
+            fields, columns = self.projection
+            appended = script5.group_csv_range(self.path, fields, columns, self.parsed_end, stat.st_size)
+            self.grouped = script5.merge_grouped_vulnerabilities([self.grouped, appended])
+            self.quotes += count_quotes(self.path, self.parsed_end, stat.st_size)
+            logger.info(f"Parsed {stat.st_size - self.parsed_end} appended bytes of {self.path}")
+        else:
+            try:
+                scanner_format = detect_format(self.path)
+            except ValueError as e:
+                logger.warning(f"Skipping {self.path}: {str(e)}")
+                self.grouped, self.projection, self.signature = {}, None, signature
+                return self.grouped
+            self.grouped = script5.load_grouped_vulnerabilities(self.path, script5.CSV_READER, script5.CSV_WORKERS)
+            self.projection = None
+            if scanner_format.name == "nessus_csv" and script5.CSV_READER == "mmap":
+                header, data_start = read_header(self.path, errors='ignore')
+                self.projection = projected_columns(header)
+                self.head = self._read(0, data_start)
+                self.quotes = count_quotes(self.path, data_start, stat.st_size)
+
+        self.parsed_end = stat.st_size
+        self.tail = self._read(max(len(self.head), stat.st_size - APPEND_CHECK_BYTES), stat.st_size)
+        self.signature = signature
+        return self.grouped
+
+
+def merge_scans(scans):
+    """One grouping of several watched exports, in order, without touching their own state."""
+    return script5.merge_grouped_vulnerabilities(
+        {name: {**finding, "affected_resource": set(finding["affected_resource"])} for name, finding in grouped.items()}
+        for grouped in scans
+    )
+
+
+def _remove(elements):
+    for element in elements:
+        element.getparent().remove(element)
+
+
+class IncrementalReport:
+    """
+    The Word report kept open between re-renders. Each finding's body elements are kept
+    with a snapshot of the finding, only new, changed or renumbered findings are rendered
+    again and the rest are moved into place.
+    """
+
+    def __init__(self, pagination=script5.PAGINATION_MODE):
+        self.doc, self.static_key = script5.new_report(script5.REPORT_TEMPLATE, script5.REPORT_TITLE)
+        self.pagination = pagination
+        body = self.doc.element.body
+        # Findings follow the template's bookmark, or whatever the document starts with
+        self.anchor = (bookmark_anchor(self.doc, FINDINGS_BOOKMARK) if script5.REPORT_TEMPLATE else None) or body[-2]
+        self.rendered = {}  # name -> ((index, last), snapshot, elements, overflow resources)
+        self.appendix = []
+
+    def _rendered_elements(self, first):
+        return [element for element in self.doc.element.body[first:] if element.tag != qn('w:sectPr')]
+
+    def _render_finding(self, index, name, finding, last):
+        """Render one finding at the end of the body, the way render_findings does."""
+        doc = self.doc
+        first = len(doc.element.body) - 1
+        data_to_append = dict(finding)
+        data_to_append["affected_resource"] = "\n".join(sort_resources(finding["affected_resource"]))
+        script5.create_table(doc, f"{index + 1}. {name}", page_break_before=(self.pagination == "heading" and index > 0))
+        if not last:
+            script5.add_finding_break(doc, self.pagination)
+        script5.join_knowledge_base(data_to_append)
+        # Its 8 tables are the last ones of the document
+        script5.append_data(doc, index, data_to_append, script5.KEYWORDS, len(doc.tables) - 8 * (index + 1))
+        return self._rendered_elements(first), data_to_append["overflow_resources"]
+
+    def update(self, grouped_vulnerabilities):
+        """Bring the document in line with the grouped findings, returns how many were rendered."""
+        _remove(self.appendix)
+        self.appendix = []
+        previous = self.rendered
+        self.rendered = {}
+        overflowing_findings = []
+        rendered = 0
+        cursor = self.anchor
+        for index, (name, finding) in enumerate(grouped_vulnerabilities.items()):
+            position = (index, index == len(grouped_vulnerabilities) - 1)
+            snapshot = {**finding, "affected_resource": frozenset(finding["affected_resource"])}
+            entry = previous.pop(name, None)
+            if entry is None or entry[0] != position or entry[1] != snapshot:
+                if entry is not None:
+                    _remove(entry[2])
+                elements, overflow = self._render_finding(index, name, finding, position[1])
+                entry = (position, snapshot, elements, overflow)
+                rendered += 1
+            for element in entry[2]:
+                cursor.addnext(element)
+                cursor = element
+            if entry[3]:
+                overflowing_findings.append((f"{index + 1}. {name}", appendix_bookmark(index), entry[3]))
+            self.rendered[name] = entry
+        for entry in previous.values():
+            _remove(entry[2])
+
+        if script5.RESOURCE_OVERFLOW_TARGET == "csv":
+            write_resource_csv(resource_csv_path(script5.OUTPUT_PATH), overflowing_findings)
+        else:
+            first = len(self.doc.element.body) - 1
+            add_resource_appendix(self.doc, overflowing_findings)
+            self.appendix = self._rendered_elements(first)
+            for element in self.appendix:
+                cursor.addnext(element)
+                cursor = element
+        return rendered
+
+    def save(self, path):
+        save_document(self.doc, path, compression=script5.OUTPUT_COMPRESSION, static_key=self.static_key)
+
+
+def watch(target, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+    """
+    Re-render the report every time the watched export, or any export in the watched
+    directory, settles after a change. Parsed scans and the open document stay in memory
+    between re-renders. Runs until interrupted.
+    """
+    report_path = script5.HTML_PATH if script5.OUTPUT_FORMAT == "html" else script5.OUTPUT_PATH
+    outputs = [
+        script5.OUTPUT_PATH, script5.HTML_PATH, tracker_path(report_path),
+        os.path.splitext(tracker_path(report_path))[0] + '.csv', resource_csv_path(script5.OUTPUT_PATH),
+    ]
+    scans = {}
+    report = None
+    for paths in iter_changes(target, interval, debounce, ignored=outputs):
+        start = time.perf_counter()
+        try:
+            scans = {path: scans.get(path) or WatchedScan(path) for path in paths}
+            grouped_vulnerabilities = merge_scans([scan.update() for scan in scans.values()])
+            if script5.FINDING_ORDER == "priority":
+                grouped_vulnerabilities = script5.prioritize_findings(grouped_vulnerabilities)
+            if script5.EXPORT_TRACKER:
+                write_tracker(grouped_vulnerabilities, tracker_path(report_path))
+
+            if script5.OUTPUT_FORMAT == "html":
+                write_html_report(grouped_vulnerabilities, script5.HTML_PATH, script5.REPORT_TITLE,
+                                  partial(script5.get_module_name, predefined_keywords=script5.KEYWORDS))
+                rendered = len(grouped_vulnerabilities)
+            else:
+                report = report or IncrementalReport()
+                rendered = report.update(grouped_vulnerabilities)
+                report.save(script5.OUTPUT_PATH)
+            logger.info(f"Re-rendered {rendered} of {len(grouped_vulnerabilities)} findings "
+                        f"in {time.perf_counter() - start:.2f} s, watching {target}")
+        except Exception as e:
+            # A half-written or broken export must not end the session, the next change retries
+            logger.error(f"Re-render failed: {str(e)}")
+            report = None